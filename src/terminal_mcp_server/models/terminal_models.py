@@ -1,9 +1,10 @@
 """Data models for Terminal MCP Server."""
 
+import asyncio
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any, Union
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class ProcessStatus(str, Enum):
@@ -20,10 +21,17 @@ class CommandRequest(BaseModel):
     command: str = Field(..., description="Command to execute")
     working_directory: Optional[str] = Field(None, description="Working directory")
     environment_variables: Dict[str, str] = Field(default_factory=dict, description="Environment variables")
-    timeout: Optional[int] = Field(None, description="Timeout in seconds")
+    timeout: Optional[Union[int, float]] = Field(None, description="Timeout in seconds (fractions allowed)")
     capture_output: bool = Field(True, description="Whether to capture output")
 
 
+def _set_event() -> asyncio.Event:
+    """Return an already-set event."""
+    event = asyncio.Event()
+    event.set()
+    return event
+
+
 class CommandResult(BaseModel):
     """Result model for command execution."""
     command: str = Field(..., description="Command that was executed")
@@ -34,6 +42,16 @@ class CommandResult(BaseModel):
     started_at: datetime = Field(..., description="When command started")
     completed_at: datetime = Field(..., description="When command completed")
     captured_chunks: Optional[List[str]] = Field(default=None, description="Captured streaming output chunks")
+    _completed: asyncio.Event = PrivateAttr(default_factory=_set_event)
+    
+    @property
+    def completed(self) -> asyncio.Event:
+        """Event set once the result is final.
+        
+        Results are final when constructed; streaming executions clear it and
+        set it again after filling the result in from the background.
+        """
+        return self._completed
 
 
 class ProcessInfo(BaseModel):
@@ -1,20 +1,45 @@
 """Core command execution utilities for Terminal MCP Server."""
 
 import asyncio
+import functools
 import logging
 import os
 import signal
 import subprocess
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, AsyncGenerator, Tuple
 import errno
 import json
+import re
 
 from ..models.terminal_models import CommandRequest, CommandResult
 from .output_streamer import OutputStreamer
 
 logger = logging.getLogger(__name__)
 
+# Basic suspicious-command patterns checked by _validate_command_safety
+_SUSPICIOUS_PATTERNS = tuple(
+    (pattern, re.compile(pattern, re.IGNORECASE))
+    for pattern in (
+        r'rm\s+-rf\s*/',  # Dangerous rm commands
+        r'>\s*/dev/sd[a-z]',  # Writing to disk devices
+        r':\(\)\{\s*:\s*\|\s*:\s*&\s*\}',  # Fork bomb pattern
+        r'sudo\s+rm',  # Sudo rm commands
+    )
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _match_suspicious_patterns(command: str) -> Tuple[str, ...]:
+    """Return the suspicious patterns found in a command (cached, commands repeat often)."""
+    return tuple(pattern for pattern, regex in _SUSPICIOUS_PATTERNS if regex.search(command))
+
+
+def _decode_output(data: Optional[bytes]) -> str:
+    """Decode process output as UTF-8, replacing invalid bytes instead of raising."""
+    return data.decode('utf-8', errors='replace') if data else ""
+
 
 class CommandExecutor:
     """Handles command execution with streaming support."""
@@ -34,6 +59,8 @@ class CommandExecutor:
         self._max_output_size = max_output_size
         self._buffer_size = buffer_size
         self._enable_safety_checks = enable_safety_checks
+        # Strong references to fire-and-forget tasks; the event loop only keeps weak ones
+        self._background_tasks: set = set()
     
     def _log_command_audit(self, request: CommandRequest, result: CommandResult, execution_id: str):
         """
@@ -61,13 +88,20 @@ class CommandExecutor:
             "completed_at": result.completed_at.isoformat()
         }
         
-        # Log as structured JSON for easy parsing
-        logger.info(f"COMMAND_AUDIT: {json.dumps(audit_data)}")
+        # Log as structured JSON for easy parsing; the dict also rides on the record as `audit`
+        logger.info(f"COMMAND_AUDIT: {json.dumps(audit_data)}", extra={"audit": audit_data})
         
         # Also log human-readable summary
         status = "SUCCESS" if result.exit_code == 0 else f"FAILED(exit_code={result.exit_code})"
         logger.info(f"Command execution {execution_id}: {status} - '{request.command}' in {result.execution_time:.3f}s")
 
+    def _start_background_task(self, coro) -> asyncio.Task:
+        """Run a coroutine in the background, keeping it referenced until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
     def _log_command_metrics(self):
         """Log cumulative command execution metrics."""
         logger.debug(f"Command execution metrics: total_commands={self._command_counter}, "
@@ -141,17 +175,8 @@ class CommandExecutor:
             warnings.append(f"Extremely long command ({len(command)} chars) may cause issues")
         
         # Check for suspicious patterns (basic checks only)
-        suspicious_patterns = [
-            r'rm\s+-rf\s*/',  # Dangerous rm commands
-            r'>\s*/dev/sd[a-z]',  # Writing to disk devices
-            r':\(\)\{\s*:\s*\|\s*:\s*&\s*\}',  # Fork bomb pattern
-            r'sudo\s+rm',  # Sudo rm commands
-        ]
-        
-        import re
-        for pattern in suspicious_patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                warnings.append(f"Potentially dangerous command pattern detected: {pattern}")
+        for pattern in _match_suspicious_patterns(command):
+            warnings.append(f"Potentially dangerous command pattern detected: {pattern}")
         
         # Check for null bytes which can cause shell issues
         if '\x00' in command:
@@ -176,6 +201,7 @@ class CommandExecutor:
             CommandResult with execution details
         """
         started_at = datetime.now()
+        start_counter = time.perf_counter()
         self._command_counter += 1
         execution_id = f"cmd_{self._command_counter}_{started_at.strftime('%Y%m%d_%H%M%S_%f')}"
         
@@ -242,8 +268,9 @@ class CommandExecutor:
                     request.command, cwd, env, request.timeout, execution_id
                 )
             
-            completed_at = datetime.now()
-            execution_time = (completed_at - started_at).total_seconds()
+            # Monotonic duration; completed_at is derived so the two always agree
+            execution_time = time.perf_counter() - start_counter
+            completed_at = started_at + timedelta(seconds=execution_time)
             self._total_execution_time += execution_time
             
             logger.info(f"[{execution_id}] Command completed with exit code: {exit_code}")
@@ -275,8 +302,8 @@ class CommandExecutor:
             return result
             
         except Exception as e:
-            completed_at = datetime.now()
-            execution_time = (completed_at - started_at).total_seconds()
+            execution_time = time.perf_counter() - start_counter
+            completed_at = started_at + timedelta(seconds=execution_time)
             self._total_execution_time += execution_time
             
             error_message = self._get_error_message(e)
@@ -304,7 +331,7 @@ class CommandExecutor:
         command: str, 
         cwd: str, 
         env: Dict[str, str], 
-        timeout: Optional[int],
+        timeout: Optional[float],
         execution_id: str
     ) -> tuple[str, str, int]:
         """Execute command with output capture."""
@@ -382,26 +409,27 @@ class CommandExecutor:
             except asyncio.TimeoutError:
                 logger.warning(f"[{execution_id}] Command timed out after {timeout} seconds")
                 
-                # Try to capture any remaining buffered output
+                # Try to capture any remaining buffered output, within the size limit
                 partial_stdout = ""
                 partial_stderr = ""
+                partial_read_size = min(32768, self._max_output_size)
                 
                 try:
                     # Quick attempt to read any immediately available data
                     if process.stdout and not process.stdout.at_eof():
                         try:
                             # Read with a very short timeout to get whatever is immediately available
-                            data = await asyncio.wait_for(process.stdout.read(32768), timeout=0.05)
+                            data = await asyncio.wait_for(process.stdout.read(partial_read_size), timeout=0.05)
                             if data:
-                                partial_stdout = data.decode('utf-8', errors='replace')
+                                partial_stdout = _decode_output(data)
                         except (asyncio.TimeoutError, UnicodeDecodeError, Exception):
                             pass
                     
                     if process.stderr and not process.stderr.at_eof():
                         try:
-                            data = await asyncio.wait_for(process.stderr.read(32768), timeout=0.05)
+                            data = await asyncio.wait_for(process.stderr.read(partial_read_size), timeout=0.05)
                             if data:
-                                partial_stderr = data.decode('utf-8', errors='replace')
+                                partial_stderr = _decode_output(data)
                         except (asyncio.TimeoutError, UnicodeDecodeError, Exception):
                             pass
                             
@@ -442,8 +470,11 @@ class CommandExecutor:
         Returns:
             All content read from the stream
         """
+        # Keep raw bytes and decode once at the end, so multi-byte characters split
+        # across reads survive and each chunk is not decoded separately
         content_parts = []
         total_size = 0
+        truncated = False
         
         try:
             while True:
@@ -454,21 +485,18 @@ class CommandExecutor:
                         # End of stream
                         break
                     
-                    # Check size limits
-                    total_size += len(chunk_bytes)
-                    if total_size > self._max_output_size:
-                        logger.warning(f"[{execution_id}] {stream_name} size limit exceeded: {total_size} > {self._max_output_size}")
-                        content_parts.append(f"\n[{stream_name.upper()} TRUNCATED: Size limit exceeded]")
+                    # Enforce the size limit per read: keep only the bytes that still fit
+                    remaining = self._max_output_size - total_size
+                    if len(chunk_bytes) > remaining:
+                        logger.warning(f"[{execution_id}] {stream_name} size limit exceeded: {total_size + len(chunk_bytes)} > {self._max_output_size}")
+                        content_parts.append(chunk_bytes[:remaining])
+                        truncated = True
+                        # Keep draining, or a writer past the limit blocks on a full pipe until the timeout
+                        await self._discard_stream(stream)
                         break
                     
-                    # Decode with error handling
-                    try:
-                        chunk_str = chunk_bytes.decode('utf-8', errors='replace')
-                        content_parts.append(chunk_str)
-                    except Exception as decode_error:
-                        logger.warning(f"[{execution_id}] Decode error for {stream_name}: {decode_error}")
-                        chunk_str = chunk_bytes.decode('latin-1', errors='replace')
-                        content_parts.append(chunk_str)
+                    total_size += len(chunk_bytes)
+                    content_parts.append(chunk_bytes)
                         
                 except asyncio.CancelledError:
                     # Task was cancelled - return whatever we've read so far
@@ -481,26 +509,36 @@ class CommandExecutor:
         except Exception as e:
             logger.error(f"[{execution_id}] Unexpected error reading {stream_name}: {e}")
         
-        result = ''.join(content_parts)
+        result = _decode_output(b''.join(content_parts))
+        if truncated:
+            result += f"\n[{stream_name.upper()} TRUNCATED: Size limit exceeded]"
         logger.debug(f"[{execution_id}] Read {len(result)} characters from {stream_name}")
         return result
     
+    async def _discard_stream(self, stream: Optional[asyncio.StreamReader]) -> None:
+        """Read a pipe to EOF without keeping the data, so a writer past the size limit can finish."""
+        if stream is None:
+            return
+        while await stream.read(self._buffer_size):
+            pass
+    
     async def _execute_without_capture(
         self, 
         command: str, 
         cwd: str, 
         env: Dict[str, str], 
-        timeout: Optional[int],
+        timeout: Optional[float],
         execution_id: str
     ) -> tuple[str, str, int]:
         """Execute command without output capture."""
         try:
             logger.debug(f"[{execution_id}] Creating subprocess without output capture")
-            # Create subprocess without capturing output
+            # Create subprocess without capturing output; discard it rather than
+            # inheriting our stdout, which carries the MCP stdio transport
             process = await asyncio.create_subprocess_shell(
                 command,
-                stdout=None,  # Don't capture
-                stderr=None,  # Don't capture
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
                 cwd=cwd,
                 env=env,
                 preexec_fn=os.setsid if hasattr(os, 'setsid') else None
@@ -550,8 +588,11 @@ class CommandExecutor:
                     logger.debug(f"[{execution_id}] Sending SIGTERM to process group")
                     os.killpg(os.getpgid(process.pid), signal.SIGTERM)
                     
-                    # Wait a bit, then check if process is still running
-                    await asyncio.sleep(0.5)
+                    # Give it up to 0.5s to exit, returning as soon as it does
+                    try:
+                        await asyncio.wait_for(process.wait(), timeout=0.5)
+                    except asyncio.TimeoutError:
+                        pass
                     
                     if process.returncode is None:
                         logger.debug(f"[{execution_id}] Process still running, sending SIGKILL to process group")
@@ -588,7 +629,6 @@ class CommandExecutor:
             
             # Give process time to terminate gracefully
             # Note: We can't use asyncio.sleep here since this is a sync method
-            import time
             time.sleep(0.5)
             
             if process.returncode is None:
@@ -753,20 +793,21 @@ class CommandExecutor:
         command: str,
         cwd: str,
         env: Dict[str, str],
-        timeout: Optional[int],
+        timeout: Optional[float],
         execution_id: str,
         output_streamer: OutputStreamer
     ) -> Tuple[AsyncGenerator[str, None], CommandResult]:
-        """Execute command with streaming output capture."""
-        started_at = datetime.now()
+        """Execute command with streaming output capture.
         
-        # Create a shared container for captured chunks that both the generator and result can access
-        class ChunkCapture:
-            def __init__(self):
-                self.chunks = []
-                self.completed = False
+        A single background task is the only reader of the process pipes: it
+        pumps chunks into the result and a queue, and the returned generator
+        replays the queue. The result therefore completes whether or not the
+        caller consumes the stream.
+        """
+        started_at = datetime.now()
         
-        chunk_capture = ChunkCapture()
+        # Chunks handed to the stream generator, terminated by a None sentinel
+        chunk_queue: asyncio.Queue = asyncio.Queue()
         
         try:
             logger.debug(f"[{execution_id}] Creating subprocess for streaming")
@@ -782,20 +823,11 @@ class CommandExecutor:
             
             logger.debug(f"[{execution_id}] Subprocess created with PID: {process.pid}")
             
-            # Create a capturing stream generator that stores chunks as they pass through
+            # Replay the pumped chunks to the caller as they arrive
             async def capturing_stream_generator():
-                try:
-                    async for chunk in output_streamer.stream_output(process):
-                        chunk_capture.chunks.append(chunk)  # Store in shared container
-                        yield chunk
-                except Exception as e:
-                    logger.error(f"[{execution_id}] Error during output streaming: {e}")
-                    error_chunk = f"\n[STREAMING ERROR: {str(e)}]"
-                    chunk_capture.chunks.append(error_chunk)
-                    yield error_chunk
-                finally:
-                    chunk_capture.completed = True
-                    logger.debug(f"[{execution_id}] Output streaming completed")
+                while (chunk := await chunk_queue.get()) is not None:
+                    yield chunk
+                logger.debug(f"[{execution_id}] Output streaming completed")
             
             # Create a preliminary result that will be updated when process completes
             # But include the shared chunk container immediately
@@ -807,30 +839,52 @@ class CommandExecutor:
                 execution_time=0.0,  # Will be updated when process completes
                 started_at=started_at,
                 completed_at=started_at,  # Will be updated when process completes
-                captured_chunks=chunk_capture.chunks  # Reference to shared container
+                captured_chunks=[]  # Filled in as chunks are read
             )
+            # Pending until the background task below has filled the result in
+            preliminary_result.completed.clear()
+            # Append to the result's own list (validation copies lists passed to the model)
+            captured_chunks = preliminary_result.captured_chunks
+            
+            async def pump_output() -> str:
+                """Stream stdout into the capture and return stderr once the process exits."""
+                # stderr is not streamed, so read it alongside, within the size limit
+                stderr_task = asyncio.create_task(
+                    self._read_stream_until_timeout(process.stderr, "stderr", execution_id)
+                )
+                try:
+                    try:
+                        async for chunk in output_streamer.stream_output(process):
+                            captured_chunks.append(chunk)
+                            chunk_queue.put_nowait(chunk)
+                    except Exception as e:
+                        logger.error(f"[{execution_id}] Error during output streaming: {e}")
+                        error_chunk = f"\n[STREAMING ERROR: {str(e)}]"
+                        captured_chunks.append(error_chunk)
+                        chunk_queue.put_nowait(error_chunk)
+                    
+                    # Past its size limit the streamer stops reading; drain the rest so the
+                    # process can exit, without appending it after the truncation notice
+                    await self._discard_stream(process.stdout)
+                    stderr_output = await stderr_task
+                    await process.wait()
+                    return stderr_output
+                finally:
+                    stderr_task.cancel()
             
             # Start process completion task in background to update the result
             async def update_result_when_complete():
                 try:
-                    # Wait for process completion with timeout
-                    if timeout:
-                        await asyncio.wait_for(process.wait(), timeout=timeout)
-                    else:
-                        await process.wait()
+                    # Wait for output and process completion with timeout
+                    stderr_output = await asyncio.wait_for(pump_output(), timeout=timeout or None)
                     
                     completed_at = datetime.now()
                     execution_time = (completed_at - started_at).total_seconds()
                     self._total_execution_time += execution_time
                     
-                    # Capture remaining output
-                    stdout_bytes, stderr_bytes = await process.communicate()
-                    stdout_output = stdout_bytes.decode('utf-8', errors='replace') if stdout_bytes else ""
-                    stderr_output = stderr_bytes.decode('utf-8', errors='replace') if stderr_bytes else ""
-                    
                     # Update the result object in place
                     preliminary_result.exit_code = process.returncode
-                    preliminary_result.stdout = stdout_output
+                    preliminary_result.stdout = ''.join(captured_chunks)
                     preliminary_result.stderr = stderr_output
                     preliminary_result.execution_time = execution_time
                     preliminary_result.completed_at = completed_at
@@ -857,6 +911,7 @@ class CommandExecutor:
                     
                     # Update result with timeout info
                     preliminary_result.exit_code = -1
+                    preliminary_result.stdout = ''.join(captured_chunks)
                     preliminary_result.stderr = f"Command timed out after {timeout} seconds"
                     preliminary_result.execution_time = execution_time
                     preliminary_result.completed_at = completed_at
@@ -868,12 +923,17 @@ class CommandExecutor:
                     
                     # Update result with error info
                     preliminary_result.exit_code = -1
+                    preliminary_result.stdout = ''.join(captured_chunks)
                     preliminary_result.stderr = f"Error during execution: {str(e)}"
                     preliminary_result.execution_time = execution_time
                     preliminary_result.completed_at = completed_at
+                
+                finally:
+                    chunk_queue.put_nowait(None)
+                    preliminary_result.completed.set()
             
             # Start background task to update result
-            asyncio.create_task(update_result_when_complete())
+            self._start_background_task(update_result_when_complete())
             
             # Return the stream generator and result immediately
             # The result contains a reference to the shared chunk container
@@ -906,21 +966,22 @@ class CommandExecutor:
         command: str,
         cwd: str,
         env: Dict[str, str],
-        timeout: Optional[int],
+        timeout: Optional[float],
         execution_id: str,
         output_streamer: OutputStreamer
     ) -> Tuple[AsyncGenerator[Tuple[str, str], None], CommandResult]:
-        """Execute command with separated streaming output capture."""
-        started_at = datetime.now()
+        """Execute command with separated streaming output capture.
         
-        # Create a shared container for captured chunks that both the generator and result can access
-        class SeparatedChunkCapture:
-            def __init__(self):
-                self.stdout_chunks = []
-                self.stderr_chunks = []
-                self.completed = False
+        As with _execute_with_streaming_capture, one background task reads
+        both pipes and the returned generator replays what it read.
+        """
+        started_at = datetime.now()
         
-        chunk_capture = SeparatedChunkCapture()
+        # Chunks as read from each stream
+        stdout_chunks = []
+        stderr_chunks = []
+        # (stdout_chunk, stderr_chunk) pairs handed to the stream generator, terminated by None
+        chunk_queue: asyncio.Queue = asyncio.Queue()
         
         try:
             logger.debug(f"[{execution_id}] Creating subprocess for separated streaming")
@@ -936,24 +997,11 @@ class CommandExecutor:
             
             logger.debug(f"[{execution_id}] Subprocess created with PID: {process.pid}")
             
-            # Create a capturing stream generator that stores chunks as they pass through
+            # Replay the pumped chunks to the caller as they arrive
             async def capturing_separated_stream_generator():
-                try:
-                    async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(process):
-                        # Store in shared container
-                        if stdout_chunk:
-                            chunk_capture.stdout_chunks.append(stdout_chunk)
-                        if stderr_chunk:
-                            chunk_capture.stderr_chunks.append(stderr_chunk)
-                        yield stdout_chunk, stderr_chunk
-                except Exception as e:
-                    logger.error(f"[{execution_id}] Error during separated output streaming: {e}")
-                    error_chunk = f"\n[SEPARATED STREAMING ERROR: {str(e)}]"
-                    chunk_capture.stderr_chunks.append(error_chunk)
-                    yield "", error_chunk
-                finally:
-                    chunk_capture.completed = True
-                    logger.debug(f"[{execution_id}] Separated output streaming completed")
+                while (chunks := await chunk_queue.get()) is not None:
+                    yield chunks
+                logger.debug(f"[{execution_id}] Separated output streaming completed")
             
             # Create a preliminary result that will be updated when process completes
             preliminary_result = CommandResult(
@@ -966,37 +1014,46 @@ class CommandExecutor:
                 completed_at=started_at,  # Will be updated when process completes
                 captured_chunks=[]  # Will be updated with combined chunks
             )
+            # Pending until the background task below has filled the result in
+            preliminary_result.completed.clear()
+            
+            async def pump_output() -> None:
+                """Stream both pipes into the capture and wait for the process to exit."""
+                try:
+                    async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(process):
+                        if stdout_chunk:
+                            stdout_chunks.append(stdout_chunk)
+                        if stderr_chunk:
+                            stderr_chunks.append(stderr_chunk)
+                        chunk_queue.put_nowait((stdout_chunk, stderr_chunk))
+                except Exception as e:
+                    logger.error(f"[{execution_id}] Error during separated output streaming: {e}")
+                    error_chunk = f"\n[SEPARATED STREAMING ERROR: {str(e)}]"
+                    stderr_chunks.append(error_chunk)
+                    chunk_queue.put_nowait(("", error_chunk))
+                
+                # Past their size limit the streams stop being read; drain the rest so the
+                # process can exit, without appending it after the truncation notices
+                await asyncio.gather(self._discard_stream(process.stdout), self._discard_stream(process.stderr))
+                await process.wait()
             
             # Start process completion task in background to update the result
             async def update_result_when_complete():
                 try:
-                    # Wait for process completion with timeout
-                    if timeout:
-                        await asyncio.wait_for(process.wait(), timeout=timeout)
-                    else:
-                        await process.wait()
+                    # Wait for output and process completion with timeout
+                    await asyncio.wait_for(pump_output(), timeout=timeout or None)
                     
                     completed_at = datetime.now()
                     execution_time = (completed_at - started_at).total_seconds()
                     self._total_execution_time += execution_time
                     
-                    # Capture any remaining output
-                    stdout_bytes, stderr_bytes = await process.communicate()
-                    stdout_output = stdout_bytes.decode('utf-8', errors='replace') if stdout_bytes else ""
-                    stderr_output = stderr_bytes.decode('utf-8', errors='replace') if stderr_bytes else ""
-                    
-                    # Combine captured chunks with final output
-                    all_stdout = ''.join(chunk_capture.stdout_chunks) + stdout_output
-                    all_stderr = ''.join(chunk_capture.stderr_chunks) + stderr_output
-                    
-                    # Update the result object in place
+                    # Update the result object in place, combining captured chunks with final output
+                    preliminary_result.stdout = ''.join(stdout_chunks)
+                    preliminary_result.stderr = ''.join(stderr_chunks)
+                    preliminary_result.captured_chunks = stdout_chunks + stderr_chunks
                     preliminary_result.exit_code = process.returncode
-                    preliminary_result.stdout = all_stdout
-                    preliminary_result.stderr = all_stderr
                     preliminary_result.execution_time = execution_time
                     preliminary_result.completed_at = completed_at
-                    # Combine chunks for backward compatibility
-                    preliminary_result.captured_chunks = chunk_capture.stdout_chunks + chunk_capture.stderr_chunks
                     
                     logger.info(f"[{execution_id}] Separated streaming command completed with exit code: {process.returncode}")
                     logger.info(f"[{execution_id}] Execution time: {execution_time:.3f}s")
@@ -1020,8 +1077,8 @@ class CommandExecutor:
                     
                     # Update result with timeout info
                     preliminary_result.exit_code = -1
-                    preliminary_result.stdout = ''.join(chunk_capture.stdout_chunks)
-                    preliminary_result.stderr = ''.join(chunk_capture.stderr_chunks) + f"\nCommand timed out after {timeout} seconds"
+                    preliminary_result.stdout = ''.join(stdout_chunks)
+                    preliminary_result.stderr = ''.join(stderr_chunks) + f"\nCommand timed out after {timeout} seconds"
                     preliminary_result.execution_time = execution_time
                     preliminary_result.completed_at = completed_at
                     
@@ -1032,13 +1089,17 @@ class CommandExecutor:
                     
                     # Update result with error info
                     preliminary_result.exit_code = -1
-                    preliminary_result.stdout = ''.join(chunk_capture.stdout_chunks)
-                    preliminary_result.stderr = ''.join(chunk_capture.stderr_chunks) + f"\nError during execution: {str(e)}"
+                    preliminary_result.stdout = ''.join(stdout_chunks)
+                    preliminary_result.stderr = ''.join(stderr_chunks) + f"\nError during execution: {str(e)}"
                     preliminary_result.execution_time = execution_time
                     preliminary_result.completed_at = completed_at
+                
+                finally:
+                    chunk_queue.put_nowait(None)
+                    preliminary_result.completed.set()
             
             # Start background task to update result
-            asyncio.create_task(update_result_when_complete())
+            self._start_background_task(update_result_when_complete())
             
             # Return the stream generator and result immediately
             return capturing_separated_stream_generator(), preliminary_result
@@ -1063,4 +1124,4 @@ class CommandExecutor:
                 yield "", f"Error: {str(e)}"
                 return
             
-            return error_separated_stream(), result 
\ No newline at end of file
+            return error_separated_stream(), result
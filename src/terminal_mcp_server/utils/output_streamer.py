@@ -3,7 +3,6 @@
 import asyncio
 import logging
 from typing import AsyncGenerator, Optional, Union
-import sys
 
 logger = logging.getLogger(__name__)
 
@@ -183,8 +182,10 @@ class OutputStreamer:
         Returns:
             Complete stream content as string
         """
+        # Accumulate raw chunks and join once; repeated concatenation would be quadratic
         content_parts = []
         total_size = 0
+        trailer = ""
         
         try:
             while True:
@@ -198,24 +199,16 @@ class OutputStreamer:
                 total_size += len(chunk_bytes)
                 if total_size > self.max_output_size:
                     logger.warning(f"{stream_name} size limit exceeded: {total_size} > {self.max_output_size}")
-                    content_parts.append(f"\n[{stream_name.upper()} TRUNCATED: Size limit exceeded]")
+                    trailer = f"\n[{stream_name.upper()} TRUNCATED: Size limit exceeded]"
                     break
                 
-                # Decode with error handling
-                try:
-                    chunk_str = chunk_bytes.decode('utf-8', errors='replace')
-                    content_parts.append(chunk_str)
-                except Exception as decode_error:
-                    logger.warning(f"Decode error for {stream_name}: {decode_error}")
-                    # Fallback to latin-1 which can decode any byte sequence
-                    chunk_str = chunk_bytes.decode('latin-1', errors='replace')
-                    content_parts.append(chunk_str)
+                content_parts.append(chunk_bytes)
         
         except Exception as e:
             logger.error(f"Error reading {stream_name}: {e}")
-            content_parts.append(f"\n[{stream_name.upper()} READ ERROR: {str(e)}]")
+            trailer = f"\n[{stream_name.upper()} READ ERROR: {str(e)}]"
         
-        return ''.join(content_parts)
+        return b''.join(content_parts).decode('utf-8', errors='replace') + trailer
     
     async def _create_empty_task(self) -> str:
         """Create an empty task that returns empty string."""
@@ -300,43 +293,34 @@ class OutputStreamer:
         """
         Merge two async generators into real-time combined output.
         
-        This simplified implementation alternates between reading from stdout and stderr,
-        yielding chunks as they become available.
+        Keeps one pending read per stream and yields whichever completes first.
+        In-flight reads are never cancelled to poll the other stream, since
+        cancelling one closes its generator and drops the rest of its output.
         """
-        # Convert generators to async iterators
-        stdout_iter = aiter(stdout_generator)
-        stderr_iter = aiter(stderr_generator)
+        iterators = {"stdout": aiter(stdout_generator), "stderr": aiter(stderr_generator)}
+        pending = {asyncio.ensure_future(anext(iterator)): name for name, iterator in iterators.items()}
         
-        # Track if streams are exhausted
-        stdout_exhausted = False
-        stderr_exhausted = False
-        
-        while not (stdout_exhausted and stderr_exhausted):
-            stdout_chunk = ""
-            stderr_chunk = ""
-            
-            # Try to get chunk from stdout
-            if not stdout_exhausted:
-                try:
-                    stdout_chunk = await asyncio.wait_for(anext(stdout_iter), timeout=0.01)
-                except (StopAsyncIteration, asyncio.TimeoutError):
-                    if isinstance(sys.exc_info()[1], StopAsyncIteration):
-                        stdout_exhausted = True
-                except Exception as e:
-                    logger.warning(f"Error reading stdout chunk: {e}")
-                    stdout_chunk = f"[STDOUT ERROR: {str(e)}]"
-            
-            # Try to get chunk from stderr
-            if not stderr_exhausted:
-                try:
-                    stderr_chunk = await asyncio.wait_for(anext(stderr_iter), timeout=0.01)
-                except (StopAsyncIteration, asyncio.TimeoutError):
-                    if isinstance(sys.exc_info()[1], StopAsyncIteration):
-                        stderr_exhausted = True
-                except Exception as e:
-                    logger.warning(f"Error reading stderr chunk: {e}")
-                    stderr_chunk = f"[STDERR ERROR: {str(e)}]"
-            
-            # Yield if we got any chunks
-            if stdout_chunk or stderr_chunk:
-                yield stdout_chunk, stderr_chunk 
\ No newline at end of file
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                chunks = {"stdout": "", "stderr": ""}
+                
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        chunks[name] = task.result()
+                    except StopAsyncIteration:
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Error reading {name} chunk: {e}")
+                        chunks[name] = f"[{name.upper()} ERROR: {str(e)}]"
+                        continue
+                    # Queue the next read from this stream
+                    pending[asyncio.ensure_future(anext(iterators[name]))] = name
+                
+                # Yield if we got any chunks
+                if chunks["stdout"] or chunks["stderr"]:
+                    yield chunks["stdout"], chunks["stderr"]
+        finally:
+            for task in pending:
+                task.cancel()
@@ -3,25 +3,33 @@
 import asyncio
 import logging
 import os
+import shlex
 import shutil
 import subprocess
 import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import json
 
 logger = logging.getLogger(__name__)
 
+# Interpreter locations relative to a venv root, precomputed so probes are plain string joins
+_POSIX_PY = os.path.join("bin", "python")
+_WIN_PY = os.path.join("Scripts", "python.exe")
+_PY_CANDIDATES = (_POSIX_PY, _WIN_PY, os.path.join("bin", "python3"))
+_NATIVE_PY = _WIN_PY if os.name == "nt" else _POSIX_PY
 
+
+@dataclass(slots=True, frozen=True)
 class VirtualEnvironmentInfo:
     """Information about a virtual environment."""
     
-    def __init__(self, name: str, path: str, python_version: str, is_active: bool = False):
-        """Initialize virtual environment info."""
-        self.name = name
-        self.path = path
-        self.python_version = python_version
-        self.is_active = is_active
+    name: str
+    path: str
+    python_version: str
+    is_active: bool = False
 
 
 class VenvManager:
@@ -40,15 +48,31 @@ class VenvManager:
         ]
         logger.info("VenvManager initialized")
     
-    async def _run_command(self, command: str, cwd: Optional[str] = None) -> tuple[int, str, str]:
-        """Run a command asynchronously and return (returncode, stdout, stderr)."""
+    async def _run_command(
+        self,
+        command: Union[str, List[str]],
+        cwd: Optional[str] = None
+    ) -> tuple[int, str, str]:
+        """
+        Run a command asynchronously and return (returncode, stdout, stderr).
+        
+        A string is run through the shell; a list is executed directly as argv.
+        """
         try:
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=cwd
-            )
+            if isinstance(command, str):
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=cwd
+                )
+            else:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=cwd
+                )
             stdout, stderr = await process.communicate()
             return process.returncode, stdout.decode('utf-8'), stderr.decode('utf-8')
         except Exception as e:
@@ -107,23 +131,19 @@ class VenvManager:
     async def _detect_venv_at_path(self, venv_path: Path) -> Optional[VirtualEnvironmentInfo]:
         """Detect virtual environment at a specific path."""
         try:
-            if not venv_path.exists():
+            venv_dir = os.fspath(venv_path)
+            if not os.path.exists(venv_dir):
                 return None
             
             # Check for common venv structure
-            python_paths = [
-                venv_path / "bin" / "python",  # Unix/Linux/macOS
-                venv_path / "Scripts" / "python.exe",  # Windows
-                venv_path / "bin" / "python3",
-            ]
-            
-            for python_path in python_paths:
-                if python_path.exists():
-                    version = await self._get_python_version(str(python_path))
+            for subpath in _PY_CANDIDATES:
+                python_path = os.path.join(venv_dir, subpath)
+                if os.path.exists(python_path):
+                    version = await self._get_python_version(python_path)
                     if version:
                         return VirtualEnvironmentInfo(
-                            name=venv_path.name,
-                            path=str(venv_path),
+                            name=os.path.basename(venv_dir),
+                            path=venv_dir,
                             python_version=version,
                             is_active=False
                         )
@@ -154,6 +174,46 @@ class VenvManager:
         
         return venvs
     
+    async def _resolve_venv(self, name: str) -> Optional[VirtualEnvironmentInfo]:
+        """
+        Find a single virtual environment by name.
+        
+        Probes ``<dir>/<name>`` in each common venv location directly, and only
+        falls back to a full listing for names that do not map to a directory
+        (e.g. the ``system-*`` interpreter entries).
+        
+        Args:
+            name: Name of the virtual environment
+            
+        Returns:
+            Information about the environment, or None if not found
+        """
+        # Only plain directory names are joined onto the search roots; "." and ".." would
+        # probe a root itself or its parent
+        if name not in ("", ".", "..") and Path(name).name == name:
+            for venv_dir in self.common_venv_paths:
+                venv_info = await self._detect_venv_at_path(venv_dir / name)
+                if venv_info:
+                    return venv_info
+        
+        for venv in await self.list_virtual_environments():
+            if venv.name == name:
+                return venv
+        
+        return None
+    
+    @staticmethod
+    def _python_executable(venv: VirtualEnvironmentInfo) -> str:
+        """Return the Python interpreter for a venv (or the path itself for interpreters)."""
+        if os.path.isfile(venv.path):
+            return venv.path
+        # Same probe order as detection, so a venv with only bin/python3 resolves to it
+        for subpath in _PY_CANDIDATES:
+            python_path = os.path.join(venv.path, subpath)
+            if os.path.exists(python_path):
+                return python_path
+        return os.path.join(venv.path, _NATIVE_PY)
+    
     async def list_virtual_environments(self) -> List[VirtualEnvironmentInfo]:
         """
         List all available virtual environments.
@@ -175,13 +235,11 @@ class VenvManager:
                 detected_venvs = await self._detect_venvs_in_directory(venv_dir)
                 venvs.extend(detected_venvs)
             
-            # Remove duplicates based on path
-            seen_paths = set()
-            unique_venvs = []
+            # Remove duplicates based on resolved path, first entry wins
+            unique_by_path: Dict[str, VirtualEnvironmentInfo] = {}
             for venv in venvs:
-                if venv.path not in seen_paths:
-                    seen_paths.add(venv.path)
-                    unique_venvs.append(venv)
+                unique_by_path.setdefault(os.path.realpath(venv.path), venv)
+            unique_venvs = list(unique_by_path.values())
             
             logger.info(f"Found {len(unique_venvs)} virtual environments")
             return unique_venvs
@@ -299,13 +357,7 @@ class VenvManager:
         
         try:
             # Find the virtual environment
-            venvs = await self.list_virtual_environments()
-            target_venv = None
-            
-            for venv in venvs:
-                if venv.name == name:
-                    target_venv = venv
-                    break
+            target_venv = await self._resolve_venv(name)
             
             if not target_venv:
                 logger.error(f"Virtual environment '{name}' not found")
@@ -313,18 +365,14 @@ class VenvManager:
             
             # For now, we can't truly activate a venv in the current process
             # But we can verify it exists and is valid
-            venv_path = Path(target_venv.path)
-            if venv_path.is_file():
+            venv_path = target_venv.path
+            if os.path.isfile(venv_path):
                 # It's a Python executable
                 return True
-            elif venv_path.is_dir():
+            elif os.path.isdir(venv_path):
                 # It's a venv directory, check for Python executable
-                python_paths = [
-                    venv_path / "bin" / "python",
-                    venv_path / "Scripts" / "python.exe"
-                ]
-                for python_path in python_paths:
-                    if python_path.exists():
+                for subpath in (_POSIX_PY, _WIN_PY):
+                    if os.path.exists(os.path.join(venv_path, subpath)):
                         return True
             
             logger.error(f"Virtual environment '{name}' is not valid")
@@ -349,66 +397,8 @@ class VenvManager:
         Returns:
             True if installation was successful
         """
-        logger.info(f"Installing package {package} in environment {venv_name or 'current'}")
-        
-        try:
-            # Determine pip executable to use
-            pip_exe = "pip"
-            
-            if venv_name:
-                # Find the virtual environment
-                venvs = await self.list_virtual_environments()
-                target_venv = None
-                
-                for venv in venvs:
-                    if venv.name == venv_name:
-                        target_venv = venv
-                        break
-                
-                if not target_venv:
-                    logger.error(f"Virtual environment '{venv_name}' not found")
-                    return False
-                
-                # Determine pip path for the venv
-                venv_path = Path(target_venv.path)
-                if venv_path.is_file():
-                    # It's a Python executable, use it with -m pip
-                    pip_exe = f'"{venv_path}" -m pip'
-                elif venv_path.is_dir():
-                    # It's a venv directory
-                    pip_paths = [
-                        venv_path / "bin" / "pip",
-                        venv_path / "Scripts" / "pip.exe"
-                    ]
-                    for pip_path in pip_paths:
-                        if pip_path.exists():
-                            pip_exe = f'"{pip_path}"'
-                            break
-                    else:
-                        # Fallback to python -m pip
-                        python_paths = [
-                            venv_path / "bin" / "python",
-                            venv_path / "Scripts" / "python.exe"
-                        ]
-                        for python_path in python_paths:
-                            if python_path.exists():
-                                pip_exe = f'"{python_path}" -m pip'
-                                break
-            
-            # Install the package
-            install_command = f'{pip_exe} install "{package}"'
-            returncode, stdout, stderr = await self._run_command(install_command)
-            
-            if returncode == 0:
-                logger.info(f"Successfully installed {package}")
-                return True
-            else:
-                logger.error(f"Failed to install {package}: {stderr}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error installing package {package}: {e}")
-            return False 
+        result = await self.install_package_with_output(package, venv_name)
+        return result["success"]
     
     async def install_package_with_output(
         self,
@@ -428,18 +418,12 @@ class VenvManager:
         logger.info(f"Installing package {package} with detailed output in environment {venv_name or 'current'}")
         
         try:
-            # Determine pip executable to use
-            pip_exe = "pip"
+            # Determine Python interpreter to run pip with
+            python_exe = sys.executable
             
             if venv_name:
                 # Find the virtual environment
-                venvs = await self.list_virtual_environments()
-                target_venv = None
-                
-                for venv in venvs:
-                    if venv.name == venv_name:
-                        target_venv = venv
-                        break
+                target_venv = await self._resolve_venv(venv_name)
                 
                 if not target_venv:
                     logger.error(f"Virtual environment '{venv_name}' not found")
@@ -452,41 +436,15 @@ class VenvManager:
                         "command": f"# Virtual environment '{venv_name}' not found"
                     }
                 
-                # Determine pip path for the venv
-                venv_path = Path(target_venv.path)
-                if venv_path.is_file():
-                    # It's a Python executable, use it with -m pip
-                    pip_exe = f'"{venv_path}" -m pip'
-                elif venv_path.is_dir():
-                    # It's a venv directory
-                    pip_paths = [
-                        venv_path / "bin" / "pip",
-                        venv_path / "Scripts" / "pip.exe"
-                    ]
-                    for pip_path in pip_paths:
-                        if pip_path.exists():
-                            pip_exe = f'"{pip_path}"'
-                            break
-                    else:
-                        # Fallback to python -m pip
-                        python_paths = [
-                            venv_path / "bin" / "python",
-                            venv_path / "Scripts" / "python.exe"
-                        ]
-                        for python_path in python_paths:
-                            if python_path.exists():
-                                pip_exe = f'"{python_path}" -m pip'
-                                break
+                python_exe = self._python_executable(target_venv)
             
             # Install the package
-            install_command = f'{pip_exe} install "{package}"'
+            install_argv = [python_exe, "-m", "pip", "install", package]
             
             # Record execution time
-            import time
-            start_time = time.time()
-            returncode, stdout, stderr = await self._run_command(install_command)
-            end_time = time.time()
-            execution_time = end_time - start_time
+            start_time = time.perf_counter()
+            returncode, stdout, stderr = await self._run_command(install_argv)
+            execution_time = time.perf_counter() - start_time
             
             if returncode == 0:
                 logger.info(f"Successfully installed {package} in {execution_time:.2f}s")
@@ -496,7 +454,7 @@ class VenvManager:
                     "stderr": stderr,
                     "returncode": returncode,
                     "execution_time": execution_time,
-                    "command": install_command
+                    "command": shlex.join(install_argv)
                 }
             else:
                 logger.error(f"Failed to install {package}: {stderr}")
@@ -506,7 +464,7 @@ class VenvManager:
                     "stderr": stderr,
                     "returncode": returncode,
                     "execution_time": execution_time,
-                    "command": install_command
+                    "command": shlex.join(install_argv)
                 }
                 
         except Exception as e:
@@ -0,0 +1,28 @@
+"""
+Shared pytest configuration for the Terminal MCP Server test suite.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip real-subprocess integration tests when FAST is set (quick pre-commit passes)."""
+    if not os.environ.get("FAST"):
+        return
+    skip_integration = pytest.mark.skip(reason="integration test skipped because FAST is set")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip_integration)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Run the event loop on uvloop when it is installed (faster subprocess transports)."""
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
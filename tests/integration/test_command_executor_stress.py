@@ -0,0 +1,26 @@
+"""
+Stress tests for the command executor against real subprocesses.
+
+These fork real shells and pipe sizeable output through the kernel, so they
+are marked slow and deselected by default (run with ``-m slow``).
+"""
+
+import pytest
+
+from terminal_mcp_server.utils.command_executor import CommandExecutor
+from terminal_mcp_server.models.terminal_models import CommandRequest
+
+pytestmark = [pytest.mark.slow, pytest.mark.integration]
+
+
+async def test_execute_command_large_output_real_pipe():
+    """Test that a real pipeline's large output is captured in full."""
+    executor = CommandExecutor()
+    request = CommandRequest(command="yes | head -n 100000", timeout=30)
+    
+    result = await executor.execute(request)
+    
+    assert result.exit_code == 0
+    lines = result.stdout.strip().split('\n')
+    assert len(lines) == 100_000
+    assert all(line == 'y' for line in lines)
@@ -9,23 +9,52 @@ import json
 import pytest
 from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from datetime import datetime
+from types import SimpleNamespace
 
 from src.terminal_mcp_server.handlers.command_handlers import CommandHandlers
 from src.terminal_mcp_server.models.terminal_models import CommandRequest, CommandResult
 
 
+# (execute_command kwargs, CommandRequest fields they must produce)
+PASSTHROUGH_CASES = [
+    pytest.param({"command": "pwd", "working_directory": "/tmp"}, {"working_directory": "/tmp"}, id="working_directory"),
+    pytest.param({"command": "env", "environment_variables": {"TEST_VAR": "test_value", "ANOTHER_VAR": "another_value"}},
+                 {"environment_variables": {"TEST_VAR": "test_value", "ANOTHER_VAR": "another_value"}},
+                 id="environment_variables"),
+    pytest.param({"command": "sleep 0.1", "timeout": 5}, {"timeout": 5}, id="timeout"),
+    pytest.param({"command": "echo 'test'", "capture_output": False}, {"capture_output": False}, id="no_capture"),
+    pytest.param({"command": "echo $TEST_VAR", "working_directory": "/tmp", "environment_variables": {"TEST_VAR": "test_value"},
+                  "timeout": 5, "capture_output": True},
+                 {"command": "echo $TEST_VAR", "working_directory": "/tmp", "environment_variables": {"TEST_VAR": "test_value"},
+                  "timeout": 5, "capture_output": True},
+                 id="all_parameters"),
+    pytest.param({"command": "test_command", "environment_variables": None}, {"environment_variables": {}},
+                 id="none_environment_variables"),
+]
+
+
 class TestCommandHandlers:
     """Test cases for CommandHandlers class."""
     
-    @pytest.fixture
+    # Session-scoped: tests only swap the executor's execute per test (mock_execute), so one instance serves all
+    @pytest.fixture(scope="session")
     def command_handlers(self):
         """Create CommandHandlers instance for testing."""
         return CommandHandlers()
     
     @pytest.fixture
+    def mock_execute(self, command_handlers):
+        """Swap a fresh AsyncMock in for the shared executor's execute method."""
+        executor = command_handlers.command_executor
+        executor.execute = mock = AsyncMock()
+        yield mock
+        # The instance attribute shadows CommandExecutor.execute; deleting it restores the method
+        del executor.execute
+    
+    @pytest.fixture(scope="session")
     def sample_command_result(self):
         """Sample CommandResult for testing."""
-        started_at = datetime.now()
+        started_at = datetime(2024, 1, 1, 0, 0, 0)  # Fixed timestamp keeps the shared fixture deterministic
         return CommandResult(
             command="echo 'test'",
             exit_code=0,
@@ -36,13 +65,32 @@ class TestCommandHandlers:
             completed_at=started_at
         )
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def mock_mcp_server(self):
         """Create mock MCP server for testing tool registration."""
         mock_server = Mock()
         mock_server.tool = Mock()
         return mock_server
     
+    @pytest.fixture(scope="module")
+    def registered_tools(self, command_handlers):
+        """Register the MCP tools once on a capturing mock server.
+        
+        Returns a namespace with the mock ``server`` and the registered ``tools``
+        keyed by function name. The tools call back into ``command_handlers``, so
+        tests can still patch its methods per test.
+        """
+        tools = {}
+        
+        def capture_tool_func(func):
+            tools[func.__name__] = func
+            return func
+        
+        server = Mock()
+        server.tool.return_value = capture_tool_func
+        command_handlers.register_tools(server)
+        return SimpleNamespace(server=server, tools=tools)
+    
     def test_init(self, command_handlers):
         """Test that CommandHandlers initializes correctly."""
         assert command_handlers is not None
@@ -50,134 +98,75 @@ class TestCommandHandlers:
         assert command_handlers.command_executor is not None
     
     @pytest.mark.asyncio
-    async def test_execute_command_basic(self, command_handlers, sample_command_result):
+    async def test_execute_command_basic(self, command_handlers, mock_execute, sample_command_result):
         """Test basic command execution."""
         # Mock the command executor
-        with patch.object(command_handlers.command_executor, 'execute', return_value=sample_command_result) as mock_execute:
-            result = await command_handlers.execute_command("echo 'test'")
-            
-            # Verify the executor was called correctly
-            mock_execute.assert_called_once()
-            call_args = mock_execute.call_args[0][0]  # First positional argument (CommandRequest)
-            
-            assert isinstance(call_args, CommandRequest)
-            assert call_args.command == "echo 'test'"
-            # Working directory should now be set to project directory by default
-            assert call_args.working_directory is not None
-            assert call_args.working_directory.endswith('terminal_mcp_server')
-            assert call_args.environment_variables == {}
-            assert call_args.timeout is None
-            assert call_args.capture_output is True
-            
-            # Verify the result
-            assert result == sample_command_result
-    
-    @pytest.mark.asyncio
-    async def test_execute_command_with_working_directory(self, command_handlers, sample_command_result):
-        """Test command execution with working directory."""
-        with patch.object(command_handlers.command_executor, 'execute', return_value=sample_command_result) as mock_execute:
-            await command_handlers.execute_command(
-                "pwd", 
-                working_directory="/tmp"
-            )
-            
-            call_args = mock_execute.call_args[0][0]
-            assert call_args.working_directory == "/tmp"
-    
-    @pytest.mark.asyncio
-    async def test_execute_command_with_environment_variables(self, command_handlers, sample_command_result):
-        """Test command execution with environment variables."""
-        env_vars = {"TEST_VAR": "test_value", "ANOTHER_VAR": "another_value"}
+        mock_execute.return_value = sample_command_result
+        result = await command_handlers.execute_command("echo 'test'")
         
-        with patch.object(command_handlers.command_executor, 'execute', return_value=sample_command_result) as mock_execute:
-            await command_handlers.execute_command(
-                "env", 
-                environment_variables=env_vars
-            )
-            
-            call_args = mock_execute.call_args[0][0]
-            assert call_args.environment_variables == env_vars
-    
-    @pytest.mark.asyncio
-    async def test_execute_command_with_timeout(self, command_handlers, sample_command_result):
-        """Test command execution with timeout."""
-        with patch.object(command_handlers.command_executor, 'execute', return_value=sample_command_result) as mock_execute:
-            await command_handlers.execute_command(
-                        "sleep 0.1",
-        timeout=5
-            )
-            
-            call_args = mock_execute.call_args[0][0]
-            assert call_args.timeout == 5
-    
-    @pytest.mark.asyncio
-    async def test_execute_command_without_output_capture(self, command_handlers, sample_command_result):
-        """Test command execution without output capture."""
-        with patch.object(command_handlers.command_executor, 'execute', return_value=sample_command_result) as mock_execute:
-            await command_handlers.execute_command(
-                "echo 'test'", 
-                capture_output=False
-            )
-            
-            call_args = mock_execute.call_args[0][0]
-            assert call_args.capture_output is False
+        # Verify the executor was called correctly
+        mock_execute.assert_called_once()
+        call_args = mock_execute.call_args[0][0]  # First positional argument (CommandRequest)
+        
+        assert isinstance(call_args, CommandRequest)
+        assert call_args.command == "echo 'test'"
+        # Working directory should now be set to project directory by default
+        assert call_args.working_directory is not None
+        assert call_args.working_directory.endswith('terminal_mcp_server')
+        assert call_args.environment_variables == {}
+        assert call_args.timeout is None
+        assert call_args.capture_output is True
+        
+        # Verify the result
+        assert result == sample_command_result
     
     @pytest.mark.asyncio
-    async def test_execute_command_with_all_parameters(self, command_handlers, sample_command_result):
-        """Test command execution with all parameters specified."""
-        env_vars = {"TEST_VAR": "test_value"}
+    @pytest.mark.parametrize("kwargs,expected", PASSTHROUGH_CASES)
+    async def test_execute_command_passes_parameters(self, command_handlers, mock_execute, sample_command_result,
+                                                     kwargs, expected):
+        """Test that execute_command arguments land on the CommandRequest sent to the executor."""
+        mock_execute.return_value = sample_command_result
+        await command_handlers.execute_command(**kwargs)
         
-        with patch.object(command_handlers.command_executor, 'execute', return_value=sample_command_result) as mock_execute:
-            await command_handlers.execute_command(
-                command="echo $TEST_VAR",
-                working_directory="/tmp",
-                environment_variables=env_vars,
-                timeout=5,
-                capture_output=True
-            )
-            
-            call_args = mock_execute.call_args[0][0]
-            assert call_args.command == "echo $TEST_VAR"
-            assert call_args.working_directory == "/tmp"
-            assert call_args.environment_variables == env_vars
-            assert call_args.timeout == 5
-            assert call_args.capture_output is True
+        request = mock_execute.call_args[0][0]
+        for field, value in expected.items():
+            assert getattr(request, field) == value, f"CommandRequest.{field}"
     
     @pytest.mark.asyncio
-    async def test_execute_command_executor_exception(self, command_handlers):
+    async def test_execute_command_executor_exception(self, command_handlers, mock_execute):
         """Test command execution when executor raises exception."""
         error_message = "Command execution failed"
         
-        with patch.object(command_handlers.command_executor, 'execute', side_effect=Exception(error_message)) as mock_execute:
-            with pytest.raises(Exception) as exc_info:
-                await command_handlers.execute_command("failing_command")
-            
-            assert str(exc_info.value) == error_message
-            mock_execute.assert_called_once()
+        mock_execute.side_effect = Exception(error_message)
+        with pytest.raises(Exception) as exc_info:
+            await command_handlers.execute_command("failing_command")
+        
+        assert str(exc_info.value) == error_message
+        mock_execute.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_execute_command_logs_execution(self, command_handlers, sample_command_result):
+    async def test_execute_command_logs_execution(self, command_handlers, mock_execute, sample_command_result):
         """Test that command execution is properly logged."""
-        with patch.object(command_handlers.command_executor, 'execute', return_value=sample_command_result):
-            with patch('src.terminal_mcp_server.handlers.command_handlers.logger') as mock_logger:
-                await command_handlers.execute_command("echo 'test'")
-                
-                # Verify logging calls
-                mock_logger.info.assert_any_call("Executing command: echo 'test'")
-                mock_logger.info.assert_any_call("Command completed with exit code: 0")
+        mock_execute.return_value = sample_command_result
+        with patch('src.terminal_mcp_server.handlers.command_handlers.logger') as mock_logger:
+            await command_handlers.execute_command("echo 'test'")
+            
+            # Verify logging calls
+            mock_logger.info.assert_any_call("Executing command: echo 'test'")
+            mock_logger.info.assert_any_call("Command completed with exit code: 0")
     
     @pytest.mark.asyncio
-    async def test_execute_command_logs_error(self, command_handlers):
+    async def test_execute_command_logs_error(self, command_handlers, mock_execute):
         """Test that command execution errors are properly logged."""
         error_message = "Command execution failed"
         
-        with patch.object(command_handlers.command_executor, 'execute', side_effect=Exception(error_message)):
-            with patch('src.terminal_mcp_server.handlers.command_handlers.logger') as mock_logger:
-                with pytest.raises(Exception):
-                    await command_handlers.execute_command("failing_command")
-                
-                # Verify error logging
-                mock_logger.error.assert_called_with(f"Command execution failed: {error_message}")
+        mock_execute.side_effect = Exception(error_message)
+        with patch('src.terminal_mcp_server.handlers.command_handlers.logger') as mock_logger:
+            with pytest.raises(Exception):
+                await command_handlers.execute_command("failing_command")
+            
+            # Verify error logging
+            mock_logger.error.assert_called_with(f"Command execution failed: {error_message}")
     
     def test_global_instance_exists(self):
         """Test that the global command_handlers instance exists."""
@@ -187,51 +176,37 @@ class TestCommandHandlers:
         assert isinstance(command_handlers, CommandHandlers)
     
     @pytest.mark.asyncio
-    async def test_execute_command_creates_correct_request_object(self, command_handlers, sample_command_result):
+    async def test_execute_command_creates_correct_request_object(self, command_handlers, mock_execute, sample_command_result):
         """Test that execute_command creates CommandRequest with correct field types."""
-        with patch.object(command_handlers.command_executor, 'execute', return_value=sample_command_result) as mock_execute:
-            await command_handlers.execute_command(
-                command="test_command",
-                working_directory="/test/dir",
-                environment_variables={"VAR1": "value1"},
-                timeout=5,
-                capture_output=False
-            )
-            
-            # Get the CommandRequest object that was passed
-            request = mock_execute.call_args[0][0]
-            
-            # Verify all fields are set correctly and have correct types
-            assert isinstance(request, CommandRequest)
-            assert isinstance(request.command, str)
-            assert isinstance(request.working_directory, str) or request.working_directory is None
-            assert isinstance(request.environment_variables, dict)
-            assert isinstance(request.timeout, int) or request.timeout is None
-            assert isinstance(request.capture_output, bool)
-    
-    @pytest.mark.asyncio
-    async def test_execute_command_handles_none_environment_variables(self, command_handlers, sample_command_result):
-        """Test that None environment_variables defaults to empty dict."""
-        with patch.object(command_handlers.command_executor, 'execute', return_value=sample_command_result) as mock_execute:
-            await command_handlers.execute_command(
-                command="test_command",
-                environment_variables=None
-            )
-            
-            request = mock_execute.call_args[0][0]
-            assert request.environment_variables == {}
+        mock_execute.return_value = sample_command_result
+        await command_handlers.execute_command(
+            command="test_command",
+            working_directory="/test/dir",
+            environment_variables={"VAR1": "value1"},
+            timeout=5,
+            capture_output=False
+        )
+        
+        # Get the CommandRequest object that was passed
+        request = mock_execute.call_args[0][0]
+        
+        # Verify all fields are set correctly and have correct types
+        assert isinstance(request, CommandRequest)
+        assert isinstance(request.command, str)
+        assert isinstance(request.working_directory, str) or request.working_directory is None
+        assert isinstance(request.environment_variables, dict)
+        assert isinstance(request.timeout, int) or request.timeout is None
+        assert isinstance(request.capture_output, bool)
     
-    def test_register_tools(self, command_handlers, mock_mcp_server):
+    def test_register_tools(self, command_handlers, registered_tools):
         """Test that register_tools method exists and can be called."""
         # Test that the method exists
         assert hasattr(command_handlers, 'register_tools')
         assert callable(command_handlers.register_tools)
         
-        # Test that it can be called without error
-        command_handlers.register_tools(mock_mcp_server)
-        
-        # Verify that the tool decorator was called
-        mock_mcp_server.tool.assert_called()
+        # Verify that the tool decorator was called and produced the tool
+        registered_tools.server.tool.assert_called()
+        assert "execute_command" in registered_tools.tools
     
     def test_register_tools_logs_registration(self, command_handlers, mock_mcp_server):
         """Test that register_tools logs the registration process."""
@@ -243,21 +218,9 @@ class TestCommandHandlers:
             mock_logger.info.assert_any_call("Command execution MCP tools registered successfully")
     
     @pytest.mark.asyncio
-    async def test_mcp_tool_execution_success(self, command_handlers, sample_command_result):
+    async def test_mcp_tool_execution_success(self, command_handlers, registered_tools, sample_command_result):
         """Test the MCP tool wrapper handles successful execution."""
-        # Create a mock server and capture the registered tool function
-        mock_server = Mock()
-        registered_tool_func = None
-        
-        def capture_tool_func(func):
-            nonlocal registered_tool_func
-            registered_tool_func = func
-            return func
-        
-        mock_server.tool.return_value = capture_tool_func
-        
-        # Register the tools
-        command_handlers.register_tools(mock_server)
+        registered_tool_func = registered_tools.tools["execute_command"]
         
         # Mock the handler's execute_command method
         with patch.object(command_handlers, 'execute_command', return_value=sample_command_result) as mock_execute:
@@ -280,21 +243,9 @@ class TestCommandHandlers:
             assert result_dict["stderr"] == ""
     
     @pytest.mark.asyncio
-    async def test_mcp_tool_execution_error(self, command_handlers):
+    async def test_mcp_tool_execution_error(self, command_handlers, registered_tools):
         """Test the MCP tool wrapper handles execution errors."""
-        # Create a mock server and capture the registered tool function
-        mock_server = Mock()
-        registered_tool_func = None
-        
-        def capture_tool_func(func):
-            nonlocal registered_tool_func
-            registered_tool_func = func
-            return func
-        
-        mock_server.tool.return_value = capture_tool_func
-        
-        # Register the tools
-        command_handlers.register_tools(mock_server)
+        registered_tool_func = registered_tools.tools["execute_command"]
         
         # Mock the handler's execute_command method to raise an exception
         error_message = "Test execution error"
@@ -3,22 +3,38 @@ Tests for Terminal MCP Server directory structure to ensure all required
 handlers, utilities, and models are properly organized.
 """
 
+import importlib
+import os
 import pytest
 from pathlib import Path
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def project_root():
     """Get the project root directory."""
     return Path(__file__).parent.parent.parent
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def src_dir(project_root):
     """Get the src directory."""
     return project_root / "src" / "terminal_mcp_server"
 
 
+@pytest.fixture(scope="session")
+def package_contents(src_dir):
+    """Map each subpackage name (handlers, models, utils) to its directory entries.
+    
+    Each directory is scanned once per session; tests check names against the
+    cached entries instead of stat-ing every expected file.
+    """
+    contents = {}
+    for name in ("handlers", "models", "utils"):
+        with os.scandir(src_dir / name) as entries:
+            contents[name] = {entry.name: entry for entry in entries}
+    return contents
+
+
 def test_main_package_structure_exists(src_dir):
     """Test that the main package structure exists."""
     assert src_dir.exists(), "Main package directory should exist"
@@ -26,221 +42,72 @@ def test_main_package_structure_exists(src_dir):
     assert (src_dir / "server.py").exists(), "Main server module should exist"
 
 
-def test_handlers_directory_structure(src_dir):
-    """Test that the handlers directory and required handler modules exist."""
-    handlers_dir = src_dir / "handlers"
-    assert handlers_dir.exists(), "Handlers directory should exist"
-    assert handlers_dir.is_dir(), "Handlers should be a directory"
-    assert (handlers_dir / "__init__.py").exists(), "Handlers __init__.py should exist"
-    
-    # Test for required handler modules
-    required_handlers = [
-        "command_handlers.py",
-        "process_handlers.py", 
-        "python_handlers.py",
-        "environment_handlers.py"
-    ]
-    
-    for handler_file in required_handlers:
-        handler_path = handlers_dir / handler_file
-        assert handler_path.exists(), f"Handler {handler_file} should exist"
-        assert handler_path.is_file(), f"Handler {handler_file} should be a file"
-
-
-def test_models_directory_structure(src_dir):
-    """Test that the models directory and required model modules exist."""
-    models_dir = src_dir / "models"
-    assert models_dir.exists(), "Models directory should exist"
-    assert models_dir.is_dir(), "Models should be a directory"
-    assert (models_dir / "__init__.py").exists(), "Models __init__.py should exist"
-    
-    # Test for required model modules
-    required_models = [
-        "terminal_models.py"
-    ]
-    
-    for model_file in required_models:
-        model_path = models_dir / model_file
-        assert model_path.exists(), f"Model {model_file} should exist"
-        assert model_path.is_file(), f"Model {model_file} should be a file"
-
-
-def test_utils_directory_structure(src_dir):
-    """Test that the utils directory and required utility modules exist."""
-    utils_dir = src_dir / "utils"
-    assert utils_dir.exists(), "Utils directory should exist"
-    assert utils_dir.is_dir(), "Utils should be a directory"
-    assert (utils_dir / "__init__.py").exists(), "Utils __init__.py should exist"
-    
-    # Test for required utility modules
-    required_utils = [
-        "command_executor.py",
-        "process_manager.py",
-        "output_streamer.py",
-        "venv_manager.py"
-    ]
+# (subpackage, modules it must contain besides __init__.py)
+REQUIRED_MODULES = [
+    ("handlers", ["command_handlers.py", "process_handlers.py", "python_handlers.py", "environment_handlers.py"]),
+    ("models", ["terminal_models.py"]),
+    ("utils", ["command_executor.py", "process_manager.py", "output_streamer.py", "venv_manager.py"]),
+]
+
+
+@pytest.mark.parametrize("subdir_name,required_files", REQUIRED_MODULES, ids=[name for name, _ in REQUIRED_MODULES])
+def test_subpackage_directory_structure(package_contents, subdir_name, required_files):
+    """Test that each subpackage directory exists with its __init__.py and required modules."""
+    entries = package_contents[subdir_name]
+    assert "__init__.py" in entries, f"{subdir_name}/__init__.py should exist"
     
-    for util_file in required_utils:
-        util_path = utils_dir / util_file
-        assert util_path.exists(), f"Utility {util_file} should exist"
-        assert util_path.is_file(), f"Utility {util_file} should be a file"
+    for module_file in required_files:
+        assert module_file in entries, f"{subdir_name}/{module_file} should exist"
+        assert entries[module_file].is_file(), f"{subdir_name}/{module_file} should be a file"
 
 
-def test_legacy_example_files_removed(src_dir):
+def test_legacy_example_files_removed(package_contents):
     """Test that legacy example files from scaffolding have been removed."""
-    handlers_dir = src_dir / "handlers"
-    models_dir = src_dir / "models"
-    
     # These files should not exist (they're from the scaffolding template)
     legacy_files = [
-        handlers_dir / "example_handlers.py",
-        models_dir / "example_models.py"
+        ("handlers", "example_handlers.py"),
+        ("models", "example_models.py")
     ]
     
-    for legacy_file in legacy_files:
-        assert not legacy_file.exists(), f"Legacy file {legacy_file.name} should be removed"
+    for subdir_name, legacy_file in legacy_files:
+        assert legacy_file not in package_contents[subdir_name], f"Legacy file {legacy_file} should be removed"
 
 
-def test_handler_modules_are_importable(src_dir):
-    """Test that all handler modules can be imported without errors."""
-    import sys
-    import importlib
-    
-    # Add src to path temporarily
-    src_path = str(src_dir.parent)
-    if src_path not in sys.path:
-        sys.path.insert(0, src_path)
-    
-    try:
-        # Test importing handler modules
-        handler_modules = [
-            "terminal_mcp_server.handlers.command_handlers",
-            "terminal_mcp_server.handlers.process_handlers",
-            "terminal_mcp_server.handlers.python_handlers", 
-            "terminal_mcp_server.handlers.environment_handlers"
-        ]
-        
-        for module_name in handler_modules:
-            try:
-                module = importlib.import_module(module_name)
-                assert module is not None, f"Module {module_name} should be importable"
-            except ImportError as e:
-                pytest.fail(f"Failed to import {module_name}: {e}")
-    finally:
-        # Clean up sys.path
-        if src_path in sys.path:
-            sys.path.remove(src_path)
-
-
-def test_model_modules_are_importable(src_dir):
-    """Test that all model modules can be imported without errors."""
-    import sys
-    import importlib
-    
-    # Add src to path temporarily
-    src_path = str(src_dir.parent)
-    if src_path not in sys.path:
-        sys.path.insert(0, src_path)
-    
-    try:
-        # Test importing model modules
-        model_modules = [
-            "terminal_mcp_server.models.terminal_models"
-        ]
-        
-        for module_name in model_modules:
-            try:
-                module = importlib.import_module(module_name)
-                assert module is not None, f"Module {module_name} should be importable"
-            except ImportError as e:
-                pytest.fail(f"Failed to import {module_name}: {e}")
-    finally:
-        # Clean up sys.path
-        if src_path in sys.path:
-            sys.path.remove(src_path)
-
-
-def test_utility_modules_are_importable(src_dir):
-    """Test that all utility modules can be imported without errors."""
-    import sys
-    import importlib
-    
-    # Add src to path temporarily
-    src_path = str(src_dir.parent)
-    if src_path not in sys.path:
-        sys.path.insert(0, src_path)
-    
+def _import_package_module(name):
+    """Import a package module once, at collection, keeping the error if it fails to import."""
     try:
-        # Test importing utility modules
-        util_modules = [
-            "terminal_mcp_server.utils.command_executor",
-            "terminal_mcp_server.utils.process_manager",
-            "terminal_mcp_server.utils.output_streamer",
-            "terminal_mcp_server.utils.venv_manager"
-        ]
-        
-        for module_name in util_modules:
-            try:
-                module = importlib.import_module(module_name)
-                assert module is not None, f"Module {module_name} should be importable"
-            except ImportError as e:
-                pytest.fail(f"Failed to import {module_name}: {e}")
-    finally:
-        # Clean up sys.path
-        if src_path in sys.path:
-            sys.path.remove(src_path)
-
-
-def test_directory_organization_follows_conventions(src_dir):
-    """Test that the directory organization follows Python packaging conventions."""
-    # Each directory should have an __init__.py file
-    subdirs = ["handlers", "models", "utils"]
-    
-    for subdir_name in subdirs:
-        subdir = src_dir / subdir_name
-        init_file = subdir / "__init__.py"
-        assert init_file.exists(), f"{subdir_name}/__init__.py should exist for proper Python package structure"
-        
-        # Check that subdirectory contains at least one .py file besides __init__.py
-        py_files = list(subdir.glob("*.py"))
-        non_init_files = [f for f in py_files if f.name != "__init__.py"]
-        assert len(non_init_files) > 0, f"{subdir_name} should contain at least one module besides __init__.py"
+        return importlib.import_module(name)
+    except ImportError as e:
+        return e
 
 
-def test_handlers_directory_exists(src_dir):
-    """Test that the handlers directory exists with required files."""
-    handlers_dir = src_dir / "handlers"
-    assert handlers_dir.exists(), "Handlers directory should exist"
-    
-    required_handlers = [
-        "command_handlers.py",
-        "process_handlers.py", 
-        "python_handlers.py",
-        "environment_handlers.py"
-    ]
-    
-    for handler_file in required_handlers:
-        assert (handlers_dir / handler_file).exists(), f"Handler {handler_file} should exist"
+# (dotted name, module or the ImportError it raised); a broken module fails its own case
+# instead of breaking collection. Modules are imported by name because handlers/__init__
+# rebinds their attribute names to handler instances.
+PACKAGE_MODULES = [
+    (name, _import_package_module(name))
+    for name in (
+        f"terminal_mcp_server.{subdir_name}.{module_file[:-3]}"
+        for subdir_name, required_files in REQUIRED_MODULES
+        for module_file in required_files
+    )
+]
 
 
-def test_models_directory_exists(src_dir):
-    """Test that the models directory exists with required files."""
-    models_dir = src_dir / "models"
-    assert models_dir.exists(), "Models directory should exist"
-    assert (models_dir / "terminal_models.py").exists(), "terminal_models.py should exist"
+@pytest.mark.parametrize("name,module", PACKAGE_MODULES, ids=[name for name, _ in PACKAGE_MODULES])
+def test_package_modules_are_importable(src_dir, name, module):
+    """Test that every handler, model and utility module imports from this source tree."""
+    if isinstance(module, ImportError):
+        pytest.fail(f"{name} failed to import: {module}")
+    assert Path(module.__file__).resolve().parent.parent == src_dir.resolve()
 
 
-def test_utils_directory_exists(src_dir):
-    """Test that the utils directory exists with required files."""
-    utils_dir = src_dir / "utils"
-    assert utils_dir.exists(), "Utils directory should exist"
-    
-    required_utils = [
-        "command_executor.py",
-        "process_manager.py",
-        "output_streamer.py",
-        "venv_manager.py"
-    ]
-    
-    for util_file in required_utils:
-        assert (utils_dir / util_file).exists(), f"Utility {util_file} should exist" 
\ No newline at end of file
+def test_directory_organization_follows_conventions(package_contents):
+    """Test that the directory organization follows Python packaging conventions."""
+    # Each directory should have an __init__.py file
+    for subdir_name, entries in package_contents.items():
+        assert "__init__.py" in entries, f"{subdir_name}/__init__.py should exist for proper Python package structure"
+        
+        # Check that subdirectory contains at least one .py file besides __init__.py
+        non_init_files = [name for name in entries if name.endswith(".py") and name != "__init__.py"]
+        assert len(non_init_files) > 0, f"{subdir_name} should contain at least one module besides __init__.py"
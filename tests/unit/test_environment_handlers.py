@@ -1,7 +1,6 @@
 """Tests for environment and directory management handlers."""
 
 import os
-import tempfile
 import pytest
 import json
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
@@ -10,13 +9,36 @@ from pathlib import Path
 from src.terminal_mcp_server.handlers.environment_handlers import EnvironmentHandlers
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def environment_handlers():
-    """Create an EnvironmentHandlers instance for testing."""
+    """Create an EnvironmentHandlers instance for testing (stateless, so shared)."""
+    return EnvironmentHandlers()
+
+
+@pytest.fixture(scope="session")
+def registered_tools(environment_handlers):
+    """Register the environment MCP tools once, returning them keyed by function name."""
+    tools = {}
+    
+    def tool_decorator():
+        def decorator(func):
+            tools[func.__name__] = func
+            return func
+        return decorator
+    
+    mock_server = MagicMock()
+    mock_server.tool = tool_decorator
+    environment_handlers.register_tools(mock_server)
+    return tools
+
+
+@pytest.fixture(autouse=True)
+def restore_cwd():
+    """Restore the working directory after each test, since several tests chdir."""
     # Save original directory
     original_dir = os.getcwd()
     
-    yield EnvironmentHandlers()
+    yield
     
     # Restore original directory after test
     try:
@@ -26,15 +48,18 @@ def environment_handlers():
         os.chdir(os.path.expanduser("~"))
 
 
-@pytest.fixture
-def temp_directory():
-    """Create a temporary directory for testing."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield temp_dir
+def unset_env(monkeypatch, name: str):
+    """Unset an environment variable and have monkeypatch remove it again at teardown.
+    
+    ``monkeypatch.delenv`` alone records nothing for an absent variable, so a value
+    set later by the code under test would leak; the placeholder ``setenv`` records
+    the absence first.
+    """
+    monkeypatch.setenv(name, "")
+    monkeypatch.delenv(name)
 
 
-@pytest.mark.asyncio
-async def test_environment_handlers_initialization(environment_handlers):
+def test_environment_handlers_initialization(environment_handlers):
     """Test that EnvironmentHandlers initializes properly."""
     assert environment_handlers is not None
     assert hasattr(environment_handlers, 'get_current_directory')
@@ -58,10 +83,9 @@ async def test_get_current_directory(environment_handlers):
 
 
 @pytest.mark.asyncio
-async def test_change_directory_success(environment_handlers, temp_directory):
+async def test_change_directory_success(environment_handlers, tmp_path):
     """Test successfully changing directory."""
-    # Ensure temp directory exists
-    assert os.path.exists(temp_directory)
+    temp_directory = str(tmp_path)
     
     result = await environment_handlers.change_directory(temp_directory)
     
@@ -86,14 +110,13 @@ async def test_change_directory_nonexistent(environment_handlers):
 
 
 @pytest.mark.asyncio
-async def test_change_directory_not_a_directory(environment_handlers, temp_directory):
+async def test_change_directory_not_a_directory(environment_handlers, tmp_path):
     """Test changing to a path that exists but is not a directory."""
     # Create a temporary file
-    temp_file = os.path.join(temp_directory, "test_file.txt")
-    with open(temp_file, "w") as f:
-        f.write("test content")
+    temp_file = tmp_path / "test_file.txt"
+    temp_file.write_text("test content")
     
-    result = await environment_handlers.change_directory(temp_file)
+    result = await environment_handlers.change_directory(str(temp_file))
     
     assert isinstance(result, dict)
     assert result["success"] is False
@@ -102,18 +125,19 @@ async def test_change_directory_not_a_directory(environment_handlers, temp_direc
 
 
 @pytest.mark.asyncio
-async def test_change_directory_permission_denied(environment_handlers):
+@pytest.mark.skipif(hasattr(os, "geteuid") and os.geteuid() == 0,
+                    reason="root bypasses directory permissions")
+async def test_change_directory_permission_denied(environment_handlers, tmp_path):
     """Test changing to a directory without permission."""
-    # Use a system directory that typically has restricted access
-    restricted_path = "/root"
+    # A directory nobody may enter; chdir must fail with a permission error
+    restricted_path = tmp_path / "restricted"
+    restricted_path.mkdir(mode=0o000)
     
-    # Only test if the path exists and we don't have access
-    if os.path.exists(restricted_path) and not os.access(restricted_path, os.R_OK):
-        result = await environment_handlers.change_directory(restricted_path)
-        
-        assert isinstance(result, dict)
-        assert result["success"] is False
-        assert "error" in result
+    result = await environment_handlers.change_directory(str(restricted_path))
+    
+    assert isinstance(result, dict)
+    assert result["success"] is False
+    assert "error" in result
 
 
 @pytest.mark.asyncio
@@ -164,14 +188,13 @@ async def test_get_environment_variables_nonexistent(environment_handlers):
 
 
 @pytest.mark.asyncio
-async def test_set_environment_variable_success(environment_handlers):
+async def test_set_environment_variable_success(environment_handlers, monkeypatch):
     """Test successfully setting an environment variable."""
     var_name = "TEST_VAR_12345"
     var_value = "test_value"
     
     # Ensure the variable doesn't exist before
-    if var_name in os.environ:
-        del os.environ[var_name]
+    unset_env(monkeypatch, var_name)
     
     result = await environment_handlers.set_environment_variable(var_name, var_value)
     
@@ -184,21 +207,17 @@ async def test_set_environment_variable_success(environment_handlers):
     
     # Verify the variable was actually set
     assert os.environ.get(var_name) == var_value
-    
-    # Cleanup
-    if var_name in os.environ:
-        del os.environ[var_name]
 
 
 @pytest.mark.asyncio
-async def test_set_environment_variable_overwrite(environment_handlers):
+async def test_set_environment_variable_overwrite(environment_handlers, monkeypatch):
     """Test overwriting an existing environment variable."""
     var_name = "TEST_OVERWRITE_VAR"
     original_value = "original_value"
     new_value = "new_value"
     
     # Set initial value
-    os.environ[var_name] = original_value
+    monkeypatch.setenv(var_name, original_value)
     
     result = await environment_handlers.set_environment_variable(var_name, new_value)
     
@@ -210,17 +229,14 @@ async def test_set_environment_variable_overwrite(environment_handlers):
     
     # Verify the variable was updated
     assert os.environ.get(var_name) == new_value
-    
-    # Cleanup
-    if var_name in os.environ:
-        del os.environ[var_name]
 
 
 @pytest.mark.asyncio
-async def test_set_environment_variable_empty_value(environment_handlers):
+async def test_set_environment_variable_empty_value(environment_handlers, monkeypatch):
     """Test setting an environment variable to an empty value."""
     var_name = "TEST_EMPTY_VAR"
     var_value = ""
+    unset_env(monkeypatch, var_name)
     
     result = await environment_handlers.set_environment_variable(var_name, var_value)
     
@@ -230,29 +246,10 @@ async def test_set_environment_variable_empty_value(environment_handlers):
     
     # Verify the variable was set to empty
     assert os.environ.get(var_name) == ""
-    
-    # Cleanup
-    if var_name in os.environ:
-        del os.environ[var_name]
 
 
-@pytest.mark.asyncio
-async def test_mcp_tool_registration(environment_handlers):
+def test_mcp_tool_registration(registered_tools):
     """Test that environment tools can be registered with MCP server."""
-    mock_server = MagicMock()
-    registered_tools = {}
-    
-    def tool_decorator():
-        def decorator(func):
-            registered_tools[func.__name__] = func
-            return func
-        return decorator
-    
-    mock_server.tool = tool_decorator
-    
-    # Register tools
-    environment_handlers.register_tools(mock_server)
-    
     # Verify all expected tools are registered
     expected_tools = [
         "get_current_directory",
@@ -267,22 +264,8 @@ async def test_mcp_tool_registration(environment_handlers):
 
 
 @pytest.mark.asyncio
-async def test_mcp_get_current_directory_tool(environment_handlers):
+async def test_mcp_get_current_directory_tool(registered_tools):
     """Test the MCP get_current_directory tool."""
-    mock_server = MagicMock()
-    registered_tools = {}
-    
-    def tool_decorator():
-        def decorator(func):
-            registered_tools[func.__name__] = func
-            return func
-        return decorator
-    
-    mock_server.tool = tool_decorator
-    
-    # Register tools
-    environment_handlers.register_tools(mock_server)
-    
     # Get the tool function
     tool_func = registered_tools['get_current_directory']
     
@@ -296,21 +279,9 @@ async def test_mcp_get_current_directory_tool(environment_handlers):
 
 
 @pytest.mark.asyncio
-async def test_mcp_change_directory_tool(environment_handlers, temp_directory):
+async def test_mcp_change_directory_tool(registered_tools, tmp_path):
     """Test the MCP change_directory tool."""
-    mock_server = MagicMock()
-    registered_tools = {}
-    
-    def tool_decorator():
-        def decorator(func):
-            registered_tools[func.__name__] = func
-            return func
-        return decorator
-    
-    mock_server.tool = tool_decorator
-    
-    # Register tools
-    environment_handlers.register_tools(mock_server)
+    temp_directory = str(tmp_path)
     
     # Get the tool function
     tool_func = registered_tools['change_directory']
@@ -325,28 +296,15 @@ async def test_mcp_change_directory_tool(environment_handlers, temp_directory):
 
 
 @pytest.mark.asyncio
-async def test_mcp_set_environment_variable_tool(environment_handlers):
+async def test_mcp_set_environment_variable_tool(registered_tools, monkeypatch):
     """Test the MCP set_environment_variable tool."""
-    mock_server = MagicMock()
-    registered_tools = {}
-    
-    def tool_decorator():
-        def decorator(func):
-            registered_tools[func.__name__] = func
-            return func
-        return decorator
-    
-    mock_server.tool = tool_decorator
-    
-    # Register tools
-    environment_handlers.register_tools(mock_server)
-    
     # Get the tool function
     tool_func = registered_tools['set_environment_variable']
     
     # Call the tool
     var_name = "TEST_MCP_VAR"
     var_value = "test_mcp_value"
+    unset_env(monkeypatch, var_name)
     
     result_json = await tool_func(var_name, var_value)
     result = json.loads(result_json)
@@ -355,34 +313,25 @@ async def test_mcp_set_environment_variable_tool(environment_handlers):
     assert result["success"] is True
     assert result["variable"] == var_name
     assert result["value"] == var_value
-    
-    # Cleanup
-    if var_name in os.environ:
-        del os.environ[var_name]
 
 
 @pytest.mark.asyncio
-async def test_error_handling_robustness(environment_handlers):
+@pytest.mark.parametrize("method,args", [
+    pytest.param("change_directory", (None,), id="none_directory"),
+    pytest.param("set_environment_variable", (None, "value"), id="none_variable_name"),
+    pytest.param("set_environment_variable", ("VAR_NAME", None), id="none_variable_value"),
+])
+async def test_error_handling_robustness(environment_handlers, method, args):
     """Test error handling for various edge cases."""
-    # Test with None directory
-    result = await environment_handlers.change_directory(None)
-    assert result["success"] is False
-    assert "error" in result
-    
-    # Test setting environment variable with None name
-    result = await environment_handlers.set_environment_variable(None, "value")
-    assert result["success"] is False
-    assert "error" in result
-    
-    # Test setting environment variable with None value
-    result = await environment_handlers.set_environment_variable("VAR_NAME", None)
+    result = await getattr(environment_handlers, method)(*args)
     assert result["success"] is False
     assert "error" in result
 
 
 @pytest.mark.asyncio
-async def test_directory_change_preserves_state(environment_handlers, temp_directory):
+async def test_directory_change_preserves_state(environment_handlers, tmp_path):
     """Test that directory changes work correctly and preserve previous state."""
+    temp_directory = str(tmp_path)
     # Get original directory
     original_result = await environment_handlers.get_current_directory()
     original_dir = original_result["current_directory"]
@@ -4,10 +4,14 @@ Unit tests for module structure and naming.
 Tests to ensure the module has been properly renamed from mcp_scaffolding to terminal_mcp_server.
 """
 
-import importlib
+import importlib.util
 import sys
 from pathlib import Path
 
+SRC = Path(__file__).resolve().parents[2] / "src"
+TERMINAL_MCP_SERVER_DIR = SRC / "terminal_mcp_server"
+MCP_SCAFFOLDING_DIR = SRC / "mcp_scaffolding"
+
 
 def test_terminal_mcp_server_module_exists():
     """Test that terminal_mcp_server module exists and can be imported."""
@@ -29,12 +33,8 @@ def test_terminal_mcp_server_submodules_exist():
         "terminal_mcp_server.models",
     ]
     
-    missing_modules = []
-    for module_name in expected_submodules:
-        try:
-            importlib.import_module(module_name)
-        except ImportError:
-            missing_modules.append(module_name)
+    # find_spec answers from sys.modules for anything already loaded
+    missing_modules = [name for name in expected_submodules if importlib.util.find_spec(name) is None]
     
     assert not missing_modules, f"Missing terminal_mcp_server submodules: {missing_modules}"
 
@@ -52,16 +52,9 @@ def test_old_mcp_scaffolding_module_not_importable():
 
 def test_terminal_mcp_server_directory_exists():
     """Test that the terminal_mcp_server directory exists in src/."""
-    src_path = Path(__file__).parent.parent.parent / "src"
-    terminal_mcp_server_path = src_path / "terminal_mcp_server"
-    
-    assert terminal_mcp_server_path.exists(), "terminal_mcp_server directory should exist in src/"
-    assert terminal_mcp_server_path.is_dir(), "terminal_mcp_server should be a directory"
+    assert TERMINAL_MCP_SERVER_DIR.is_dir(), "terminal_mcp_server directory should exist in src/"
 
 
 def test_old_mcp_scaffolding_directory_not_exists():
     """Test that the old mcp_scaffolding directory no longer exists in src/."""
-    src_path = Path(__file__).parent.parent.parent / "src"
-    mcp_scaffolding_path = src_path / "mcp_scaffolding"
-    
-    assert not mcp_scaffolding_path.exists(), "Old mcp_scaffolding directory should not exist after renaming" 
\ No newline at end of file
+    assert not MCP_SCAFFOLDING_DIR.exists(), "Old mcp_scaffolding directory should not exist after renaming" 
\ No newline at end of file
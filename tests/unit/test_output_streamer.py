@@ -13,6 +13,11 @@ from io import BytesIO
 from src.terminal_mcp_server.utils.output_streamer import OutputStreamer
 
 
+async def collect_stream(stream) -> list:
+    """Collect every chunk a stream yields until it ends."""
+    return [chunk async for chunk in stream]
+
+
 class TestOutputStreamer:
     """Test cases for OutputStreamer class."""
     
@@ -64,9 +69,7 @@ class TestOutputStreamer:
             b"",  # EOF
         ]
         
-        chunks = []
-        async for chunk in output_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(output_streamer.stream_output(mock_process))
         
         assert len(chunks) >= 2
         assert all(isinstance(chunk, str) for chunk in chunks)
@@ -81,9 +84,7 @@ class TestOutputStreamer:
             b"",  # EOF
         ]
         
-        chunks = []
-        async for chunk in output_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(output_streamer.stream_output(mock_process))
             
         # Should receive chunks that respect buffer size constraints
         assert len(chunks) > 0
@@ -93,9 +94,7 @@ class TestOutputStreamer:
         """Test streaming with process that has no output."""
         mock_process.stdout.read.side_effect = [b""]  # Immediate EOF
         
-        chunks = []
-        async for chunk in output_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(output_streamer.stream_output(mock_process))
         
         # Should handle empty output gracefully
         assert isinstance(chunks, list)
@@ -106,9 +105,7 @@ class TestOutputStreamer:
         mock_process.stdout.read.side_effect = [b"test", b""]
         
         with patch('src.terminal_mcp_server.utils.output_streamer.logger') as mock_logger:
-            chunks = []
-            async for chunk in output_streamer.stream_output(mock_process):
-                chunks.append(chunk)
+            await collect_stream(output_streamer.stream_output(mock_process))
             
             # Verify logging calls
             mock_logger.info.assert_any_call("Starting output streaming")
@@ -121,9 +118,7 @@ class TestOutputStreamer:
         mock_process.stdout.read.side_effect = [b"stdout chunk 1\n", b"stdout chunk 2\n", b""]
         mock_process.stderr.read.side_effect = [b"stderr chunk 1\n", b"stderr chunk 2\n", b""]
         
-        chunks = []
-        async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(mock_process):
-            chunks.append((stdout_chunk, stderr_chunk))
+        chunks = await collect_stream(output_streamer.stream_output_with_separation(mock_process))
         
         # Should receive tuples of (stdout, stderr)
         assert len(chunks) > 0
@@ -137,9 +132,7 @@ class TestOutputStreamer:
         mock_process.stdout.read.side_effect = [b"stdout only\n", b""]
         mock_process.stderr.read.side_effect = [b""]  # No stderr content
         
-        chunks = []
-        async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(mock_process):
-            chunks.append((stdout_chunk, stderr_chunk))
+        chunks = await collect_stream(output_streamer.stream_output_with_separation(mock_process))
         
         # Should receive chunks with stdout content and empty stderr
         assert len(chunks) > 0
@@ -155,9 +148,7 @@ class TestOutputStreamer:
         mock_process.stdout.read.side_effect = [b""]  # No stdout content
         mock_process.stderr.read.side_effect = [b"stderr only\n", b""]
         
-        chunks = []
-        async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(mock_process):
-            chunks.append((stdout_chunk, stderr_chunk))
+        chunks = await collect_stream(output_streamer.stream_output_with_separation(mock_process))
         
         # Should receive chunks with stderr content and empty stdout
         assert len(chunks) > 0
@@ -173,9 +164,7 @@ class TestOutputStreamer:
         mock_process.stdout = None
         mock_process.stderr = None
         
-        chunks = []
-        async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(mock_process):
-            chunks.append((stdout_chunk, stderr_chunk))
+        chunks = await collect_stream(output_streamer.stream_output_with_separation(mock_process))
         
         # Should handle gracefully and return empty strings
         assert isinstance(chunks, list)
@@ -190,9 +179,7 @@ class TestOutputStreamer:
         mock_process.stdout.read.side_effect = [large_stdout_data.encode(), b""]
         mock_process.stderr.read.side_effect = [large_stderr_data.encode(), b""]
         
-        chunks = []
-        async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(mock_process):
-            chunks.append((stdout_chunk, stderr_chunk))
+        chunks = await collect_stream(output_streamer.stream_output_with_separation(mock_process))
         
         # Should receive chunks and handle size limits
         assert len(chunks) > 0
@@ -205,6 +192,22 @@ class TestOutputStreamer:
         has_truncation = "TRUNCATED" in all_stdout or "TRUNCATED" in all_stderr
         assert has_truncation
     
+    @pytest.mark.asyncio
+    async def test_stream_output_with_separation_slow_stream_keeps_output(self, output_streamer, mock_process):
+        """Test that a stream slower than the other loses none of its output."""
+        async def slow_stderr_read(_size):
+            await asyncio.sleep(0.05)
+            return slow_stderr_chunks.pop(0)
+        
+        slow_stderr_chunks = [b"late stderr 1\n", b"late stderr 2\n", b""]
+        mock_process.stdout.read.side_effect = [b"stdout chunk 1\n", b"stdout chunk 2\n", b""]
+        mock_process.stderr.read.side_effect = slow_stderr_read
+        
+        chunks = await collect_stream(output_streamer.stream_output_with_separation(mock_process))
+        
+        assert ''.join(stdout for stdout, _ in chunks) == "stdout chunk 1\nstdout chunk 2\n"
+        assert ''.join(stderr for _, stderr in chunks) == "late stderr 1\nlate stderr 2\n"
+    
     @pytest.mark.asyncio
     async def test_stream_output_with_separation_unicode_handling(self, output_streamer, mock_process):
         """Test that separated streaming handles unicode correctly."""
@@ -215,9 +218,7 @@ class TestOutputStreamer:
         mock_process.stdout.read.side_effect = [unicode_stdout.encode('utf-8'), b""]
         mock_process.stderr.read.side_effect = [unicode_stderr.encode('utf-8'), b""]
         
-        chunks = []
-        async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(mock_process):
-            chunks.append((stdout_chunk, stderr_chunk))
+        chunks = await collect_stream(output_streamer.stream_output_with_separation(mock_process))
         
         # Should properly decode unicode
         assert len(chunks) > 0
@@ -234,9 +235,7 @@ class TestOutputStreamer:
         mock_process.stdout.read.side_effect = Exception("Stream read error")
         mock_process.stderr.read.side_effect = [b"stderr content", b""]
         
-        chunks = []
-        async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(mock_process):
-            chunks.append((stdout_chunk, stderr_chunk))
+        chunks = await collect_stream(output_streamer.stream_output_with_separation(mock_process))
         
         # Should handle errors gracefully
         assert len(chunks) >= 0  # May be empty or contain error messages
@@ -254,9 +253,7 @@ class TestOutputStreamer:
         mock_process.stderr.read.side_effect = [b"test stderr", b""]
         
         with patch('src.terminal_mcp_server.utils.output_streamer.logger') as mock_logger:
-            chunks = []
-            async for stdout_chunk, stderr_chunk in output_streamer.stream_output_with_separation(mock_process):
-                chunks.append((stdout_chunk, stderr_chunk))
+            await collect_stream(output_streamer.stream_output_with_separation(mock_process))
             
             # Verify logging calls
             mock_logger.info.assert_any_call("Starting separated output streaming")
@@ -400,9 +397,7 @@ class TestOutputStreamer:
         
         mock_process.stdout.read.side_effect = [b"test data", b""]
         
-        chunks = []
-        async for chunk in custom_buffer_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(custom_buffer_streamer.stream_output(mock_process))
         
         # Should complete without errors using custom buffer size
         assert isinstance(chunks, list)
@@ -420,10 +415,10 @@ class TestOutputStreamer:
         
         # Start concurrent streaming
         task1 = asyncio.create_task(
-            self._collect_stream_chunks(output_streamer.stream_output(mock_process1))
+            collect_stream(output_streamer.stream_output(mock_process1))
         )
         task2 = asyncio.create_task(
-            self._collect_stream_chunks(output_streamer.stream_output(mock_process2))
+            collect_stream(output_streamer.stream_output(mock_process2))
         )
         
         # Wait for both to complete
@@ -431,13 +426,6 @@ class TestOutputStreamer:
         
         assert isinstance(chunks1, list)
         assert isinstance(chunks2, list)
-    
-    async def _collect_stream_chunks(self, stream):
-        """Helper method to collect all chunks from a stream."""
-        chunks = []
-        async for chunk in stream:
-            chunks.append(chunk)
-        return chunks
 
 
 class TestAdvancedBufferConfiguration:
@@ -473,16 +461,12 @@ class TestAdvancedBufferConfiguration:
         test_data = "Small test data"
         mock_process.stdout.read.side_effect = [test_data.encode(), b""]
         
-        chunks = []
-        chunk_sizes = []
-        async for chunk in micro_buffer_streamer.stream_output(mock_process):
-            chunks.append(chunk)
-            chunk_sizes.append(len(chunk))
+        chunks = await collect_stream(micro_buffer_streamer.stream_output(mock_process))
         
         assert len(chunks) > 0
         assert all(isinstance(chunk, str) for chunk in chunks)
         # With micro buffer, should respect buffer size limits
-        assert all(size <= micro_buffer_streamer.buffer_size for size in chunk_sizes)
+        assert all(len(chunk) <= micro_buffer_streamer.buffer_size for chunk in chunks)
     
     @pytest.mark.asyncio
     async def test_adaptive_buffer_sizing_large_data(self, micro_buffer_streamer, mock_process):
@@ -496,14 +480,10 @@ class TestAdvancedBufferConfiguration:
             b""  # EOF
         ]
         
-        chunks = []
-        total_data = ""
-        async for chunk in micro_buffer_streamer.stream_output(mock_process):
-            chunks.append(chunk)
-            total_data += chunk
+        chunks = await collect_stream(micro_buffer_streamer.stream_output(mock_process))
         
         assert len(chunks) >= 3  # Should have multiple chunks due to small buffer
-        assert len(total_data) == len(test_data)
+        assert len("".join(chunks)) == len(test_data)
     
     @pytest.mark.asyncio
     async def test_buffer_memory_efficiency(self, large_buffer_streamer, mock_process):
@@ -512,9 +492,7 @@ class TestAdvancedBufferConfiguration:
         test_data = "Y" * 50000  # 50KB of data
         mock_process.stdout.read.side_effect = [test_data.encode(), b""]
         
-        chunks = []
-        async for chunk in large_buffer_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(large_buffer_streamer.stream_output(mock_process))
         
         # Large buffer should handle data more efficiently (fewer chunks)
         assert len(chunks) > 0
@@ -537,16 +515,12 @@ class TestAdvancedBufferConfiguration:
         
         # Micro buffer streaming
         start_time = time.time()
-        micro_chunks = []
-        async for chunk in micro_buffer_streamer.stream_output(mock_process_micro):
-            micro_chunks.append(chunk)
+        micro_chunks = await collect_stream(micro_buffer_streamer.stream_output(mock_process_micro))
         micro_time = time.time() - start_time
         
         # Large buffer streaming
         start_time = time.time()
-        large_chunks = []
-        async for chunk in large_buffer_streamer.stream_output(mock_process_large):
-            large_chunks.append(chunk)
+        large_chunks = await collect_stream(large_buffer_streamer.stream_output(mock_process_large))
         large_time = time.time() - start_time
         
         # Both should complete successfully
@@ -580,8 +554,7 @@ class TestAdvancedBufferConfiguration:
         # Should have received chunks in real-time intervals
         assert len(chunk_times) >= 3
     
-    @pytest.mark.asyncio
-    async def test_dynamic_buffer_size_adjustment(self):
+    def test_dynamic_buffer_size_adjustment(self):
         """Test that buffer size can be dynamically adjusted during streaming."""
         # Create streamer with initial buffer size
         streamer = OutputStreamer(buffer_size=1024)
@@ -639,7 +612,7 @@ class TestAdvancedBufferConfiguration:
         # Start concurrent streaming
         tasks = []
         for streamer, process in zip(streamers, processes):
-            task = asyncio.create_task(self._collect_all_chunks(streamer.stream_output(process)))
+            task = asyncio.create_task(collect_stream(streamer.stream_output(process)))
             tasks.append(task)
         
         # Wait for all to complete
@@ -649,13 +622,6 @@ class TestAdvancedBufferConfiguration:
         assert len(results) == 3
         assert all(len(chunks) > 0 for chunks in results)
     
-    async def _collect_all_chunks(self, stream):
-        """Helper to collect all chunks from a stream."""
-        chunks = []
-        async for chunk in stream:
-            chunks.append(chunk)
-        return chunks
-    
     def test_buffer_size_validation(self):
         """Test that buffer size validation works correctly."""
         # Valid buffer sizes
@@ -694,9 +660,7 @@ class TestAdvancedBufferConfiguration:
         large_data = b"X" * 1000
         mock_process.stdout.read.side_effect = [large_data, b""]
         
-        chunks = []
-        async for chunk in small_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(small_streamer.stream_output(mock_process))
         
         # Should have truncated output
         total_output = "".join(chunks)
@@ -735,9 +699,7 @@ class TestMemorySafeguards:
             b""
         ]
         
-        chunks = []
-        async for chunk in micro_memory_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(micro_memory_streamer.stream_output(mock_process))
         
         # Should have received chunks and then a truncation message
         total_output = "".join(chunks)
@@ -800,12 +762,9 @@ class TestMemorySafeguards:
         mock_process.stdout.read.side_effect = [large_stdout.encode(), b""]
         mock_process.stderr.read.side_effect = [large_stderr.encode(), b""]
         
-        stdout_chunks = []
-        stderr_chunks = []
-        
-        async for stdout_chunk, stderr_chunk in micro_memory_streamer.stream_output_with_separation(mock_process):
-            stdout_chunks.append(stdout_chunk)
-            stderr_chunks.append(stderr_chunk)
+        chunks = await collect_stream(micro_memory_streamer.stream_output_with_separation(mock_process))
+        stdout_chunks = [stdout for stdout, _ in chunks]
+        stderr_chunks = [stderr for _, stderr in chunks]
         
         # Check for truncation in collected output
         total_stdout = "".join(stdout_chunks)
@@ -824,9 +783,7 @@ class TestMemorySafeguards:
         chunks_to_send = [small_chunk.encode() for _ in range(num_chunks)] + [b""]
         mock_process.stdout.read.side_effect = chunks_to_send
         
-        received_chunks = []
-        async for chunk in memory_safe_streamer.stream_output(mock_process):
-            received_chunks.append(chunk)
+        received_chunks = await collect_stream(memory_safe_streamer.stream_output(mock_process))
         
         # Should eventually hit the limit and include truncation message
         total_output = "".join(received_chunks)
@@ -839,9 +796,7 @@ class TestMemorySafeguards:
         mock_process.stdout.read.side_effect = [large_chunk.encode(), b""]
         
         with patch('src.terminal_mcp_server.utils.output_streamer.logger') as mock_logger:
-            chunks = []
-            async for chunk in micro_memory_streamer.stream_output(mock_process):
-                chunks.append(chunk)
+            await collect_stream(micro_memory_streamer.stream_output(mock_process))
             
             # Should log the size limit violation
             mock_logger.warning.assert_called()
@@ -855,9 +810,7 @@ class TestMemorySafeguards:
         unicode_data = "测试数据" * 200  # Chinese characters, each ~3 bytes in UTF-8
         mock_process.stdout.read.side_effect = [unicode_data.encode(), b""]
         
-        chunks = []
-        async for chunk in micro_memory_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(micro_memory_streamer.stream_output(mock_process))
         
         # Should handle Unicode properly while respecting memory limits
         total_output = "".join(chunks)
@@ -872,9 +825,7 @@ class TestMemorySafeguards:
         exact_data = "x" * micro_memory_streamer.max_output_size
         mock_process.stdout.read.side_effect = [exact_data.encode(), b""]
         
-        chunks = []
-        async for chunk in micro_memory_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(micro_memory_streamer.stream_output(mock_process))
         
         # Should handle exact limit gracefully
         total_output = "".join(chunks)
@@ -894,9 +845,7 @@ class TestMemorySafeguards:
             b""
         ]
         
-        chunks = []
-        async for chunk in micro_memory_streamer.stream_output(mock_process):
-            chunks.append(chunk)
+        chunks = await collect_stream(micro_memory_streamer.stream_output(mock_process))
         
         # Should respect memory limits regardless of buffer alignment
         total_output = "".join(chunks)
@@ -29,8 +29,7 @@ def mock_process_manager():
     return mock_manager
 
 
-@pytest.mark.asyncio
-async def test_process_handlers_initialization(process_handlers):
+def test_process_handlers_initialization(process_handlers):
     """Test that ProcessHandlers initializes properly."""
     assert process_handlers is not None
     assert hasattr(process_handlers, 'process_manager')
@@ -313,8 +312,7 @@ async def test_get_process_output_failure(process_handlers, mock_process_manager
     assert "No output captured" in result["error"]
 
 
-@pytest.mark.asyncio
-async def test_mcp_tool_registration(process_handlers):
+def test_mcp_tool_registration(process_handlers):
     """Test that MCP tools are registered correctly."""
     mock_mcp_server = Mock()
     mock_tool_decorator = Mock()
@@ -433,8 +431,7 @@ async def test_concurrent_process_operations(process_handlers, mock_process_mana
 
 # ========== Task 3.9: Server Integration Tests ==========
 
-@pytest.mark.asyncio
-async def test_process_handlers_server_registration():
+def test_process_handlers_server_registration():
     """Test that process handlers are properly registered in the server."""
     # Import here to avoid circular imports
     from terminal_mcp_server.server import TerminalMCPServer
@@ -474,8 +471,7 @@ async def test_process_handlers_server_registration():
         assert process_handlers_registered, "Process handlers should be registered in server._register_tools method"
 
 
-@pytest.mark.asyncio 
-async def test_server_process_tools_integration():
+def test_server_process_tools_integration():
     """Test that server properly integrates process handlers tools."""
     # Import here to avoid circular imports
     from terminal_mcp_server.server import TerminalMCPServer
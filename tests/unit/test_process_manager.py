@@ -20,8 +20,7 @@ def process_manager():
     return ProcessManager()
 
 
-@pytest.mark.asyncio
-async def test_process_manager_initialization(process_manager):
+def test_process_manager_initialization(process_manager):
     """Test that ProcessManager initializes properly."""
     assert process_manager is not None
     assert hasattr(process_manager, 'processes')
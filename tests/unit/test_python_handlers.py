@@ -37,8 +37,7 @@ def mock_venv_manager():
     return mock_manager
 
 
-@pytest.mark.asyncio
-async def test_python_handlers_initialization(python_handlers):
+def test_python_handlers_initialization(python_handlers):
     """Test that PythonHandlers initializes properly."""
     assert python_handlers is not None
     assert hasattr(python_handlers, 'command_executor')
@@ -399,8 +398,7 @@ async def test_install_dependencies_from_requirements(python_handlers, mock_venv
     assert "flask" in str(result["installed_packages"])
 
 
-@pytest.mark.asyncio
-async def test_mcp_tool_registration(python_handlers):
+def test_mcp_tool_registration(python_handlers):
     """Test that MCP tools are registered correctly."""
     mock_mcp_server = Mock()
     mock_tool_decorator = Mock()
@@ -824,8 +822,7 @@ async def test_streaming_with_large_output(python_handlers, mock_command_executo
     assert final_result["success"] is True
 
 
-@pytest.mark.asyncio
-async def test_streaming_mcp_tool_integration(python_handlers):
+def test_streaming_mcp_tool_integration(python_handlers):
     """Test that MCP tools support streaming functionality."""
     # Mock MCP server
     mock_mcp_server = Mock()
@@ -50,6 +50,9 @@ def test_command_result_creation():
     assert result.execution_time == 0.1
     assert result.started_at == started_at
     assert result.completed_at == completed_at
+    # A freshly built result is already final
+    assert result.completed.is_set()
+    assert "completed" not in result.model_dump()
 
 
 def test_process_status_enum():
@@ -3,10 +3,12 @@ Unit tests for VenvManager - Virtual environment detection and management utilit
 """
 
 import pytest
+from dataclasses import FrozenInstanceError
 from unittest.mock import Mock, patch, AsyncMock
 from pathlib import Path
 import tempfile
 import os
+import sys
 
 from terminal_mcp_server.utils.venv_manager import VenvManager, VirtualEnvironmentInfo
 
@@ -43,6 +45,28 @@ class TestVirtualEnvironmentInfo:
         )
         
         assert venv.is_active is False
+    
+    def test_venv_info_uses_slots(self):
+        """Test VirtualEnvironmentInfo does not carry a per-instance __dict__."""
+        venv = VirtualEnvironmentInfo(
+            name="env",
+            path="/path",
+            python_version="3.11.0"
+        )
+        
+        assert not hasattr(venv, "__dict__")
+    
+    def test_venv_info_is_frozen_and_hashable(self):
+        """Test VirtualEnvironmentInfo is immutable and usable as a set member."""
+        venv = VirtualEnvironmentInfo(
+            name="env",
+            path="/path",
+            python_version="3.11.0"
+        )
+        
+        with pytest.raises(FrozenInstanceError):
+            venv.is_active = True
+        assert {venv, VirtualEnvironmentInfo("env", "/path", "3.11.0")} == {venv}
 
 
 class TestVenvManager:
@@ -95,3 +119,56 @@ class TestVenvManager:
         result = await venv_manager.install_package("requests")
         
         assert result is True
+    
+    @pytest.mark.asyncio
+    async def test_resolve_venv_probes_path_directly(self, venv_manager, tmp_path):
+        """Test named lookup finds a venv without listing every environment."""
+        bin_dir = tmp_path / "project" / "bin"
+        bin_dir.mkdir(parents=True)
+        (bin_dir / "python").symlink_to(sys.executable)
+        venv_manager.common_venv_paths = [tmp_path]
+        
+        with patch.object(venv_manager, 'list_virtual_environments', new=AsyncMock()) as mock_list:
+            venv = await venv_manager._resolve_venv("project")
+        
+        assert venv is not None
+        assert venv.name == "project"
+        assert venv.path == str(tmp_path / "project")
+        mock_list.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("name", ["", ".", ".."])
+    async def test_resolve_venv_rejects_relative_names(self, venv_manager, tmp_path, name):
+        """Test empty, "." and ".." names are not probed as venvs under the search roots."""
+        # tmp_path itself looks like a venv, and so does its "venvs" child
+        for venv_dir in (tmp_path, tmp_path / "venvs"):
+            (venv_dir / "bin").mkdir(parents=True)
+            (venv_dir / "bin" / "python").symlink_to(sys.executable)
+        venv_manager.common_venv_paths = [tmp_path / "venvs"]
+        
+        with patch.object(venv_manager, 'list_virtual_environments', new=AsyncMock(return_value=[])):
+            venv = await venv_manager._resolve_venv(name)
+        
+        assert venv is None
+    
+    def test_python_executable_finds_python3_only_venv(self, tmp_path):
+        """Test a venv that only has bin/python3 resolves to that interpreter."""
+        (tmp_path / "bin").mkdir()
+        (tmp_path / "bin" / "python3").symlink_to(sys.executable)
+        venv = VirtualEnvironmentInfo("py3only", str(tmp_path), "3.11.0")
+        
+        assert VenvManager._python_executable(venv) == str(tmp_path / "bin" / "python3")
+    
+    @pytest.mark.asyncio
+    async def test_install_package_runs_pip_through_venv_python(self, venv_manager):
+        """Test package installs invoke `<venv python> -m pip` as argv."""
+        venv = VirtualEnvironmentInfo("my env", "/path/to/my env", "3.11.0")
+        
+        with patch.object(venv_manager, '_resolve_venv', new=AsyncMock(return_value=venv)), \
+             patch.object(venv_manager, '_run_command', new=AsyncMock(return_value=(0, "ok", ""))) as mock_run:
+            result = await venv_manager.install_package_with_output("requests", "my env")
+        
+        expected_python = os.path.join("/path/to/my env", "bin", "python")
+        mock_run.assert_awaited_once_with([expected_python, "-m", "pip", "install", "requests"])
+        assert result["success"] is True
+        assert result["command"] == f"'{expected_python}' -m pip install requests"